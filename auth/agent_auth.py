@@ -8,7 +8,7 @@ import os
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.data_utils import get_db_connection
+from utils.data_utils import db_connection
 
 def hash_password(password):
     """Hash password using SHA-256"""
@@ -32,24 +32,21 @@ def validate_password(password):
 def create_agent(name, agent_id, password):
     """Create a new agent account"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if agent ID already exists
-        cursor.execute("SELECT id FROM agents WHERE agent_id = ?", (agent_id,))
-        if cursor.fetchone():
-            conn.close()
-            return False, "Agent ID already registered"
-        
-        # Insert new agent
-        hashed_password = hash_password(password)
-        cursor.execute("""
-            INSERT INTO agents (name, agent_id, password, created_at, status)
-            VALUES (?, ?, ?, ?, ?)
-        """, (name, agent_id, hashed_password, datetime.now().isoformat(), 'active'))
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Check if agent ID already exists
+            cursor.execute("SELECT id FROM agents WHERE agent_id = ?", (agent_id,))
+            if cursor.fetchone():
+                return False, "Agent ID already registered"
+            
+            # Insert new agent
+            hashed_password = hash_password(password)
+            cursor.execute("""
+                INSERT INTO agents (name, agent_id, password, created_at, status)
+                VALUES (?, ?, ?, ?, ?)
+            """, (name, agent_id, hashed_password, datetime.now().isoformat(), 'active'))
         
-        conn.commit()
-        conn.close()
         return True, "Agent account created successfully"
     
     except Exception as e:
@@ -58,17 +55,16 @@ def create_agent(name, agent_id, password):
 def authenticate_agent(agent_id, password):
     """Authenticate agent login"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        hashed_password = hash_password(password)
-        cursor.execute("""
-            SELECT id, name, agent_id, status FROM agents 
-            WHERE agent_id = ? AND password = ?
-        """, (agent_id, hashed_password))
-        
-        agent = cursor.fetchone()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            hashed_password = hash_password(password)
+            cursor.execute("""
+                SELECT id, name, agent_id, status FROM agents 
+                WHERE agent_id = ? AND password = ?
+            """, (agent_id, hashed_password))
+            
+            agent = cursor.fetchone()
         
         if agent:
             if agent[3] != 'active':
@@ -8,7 +8,7 @@ import os
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.data_utils import get_db_connection
+from utils.data_utils import db_connection
 
 def hash_password(password):
     """Hash password using SHA-256"""
@@ -32,24 +32,21 @@ def validate_password(password):
 def create_user(name, email, password):
     """Create a new user account"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if email already exists
-        cursor.execute("SELECT id FROM users WHERE email = ?", (email,))
-        if cursor.fetchone():
-            conn.close()
-            return False, "Email already registered"
-        
-        # Insert new user
-        hashed_password = hash_password(password)
-        cursor.execute("""
-            INSERT INTO users (name, email, password, created_at)
-            VALUES (?, ?, ?, ?)
-        """, (name, email, hashed_password, datetime.now().isoformat()))
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Check if email already exists
+            cursor.execute("SELECT id FROM users WHERE email = ?", (email,))
+            if cursor.fetchone():
+                return False, "Email already registered"
+            
+            # Insert new user
+            hashed_password = hash_password(password)
+            cursor.execute("""
+                INSERT INTO users (name, email, password, created_at)
+                VALUES (?, ?, ?, ?)
+            """, (name, email, hashed_password, datetime.now().isoformat()))
         
-        conn.commit()
-        conn.close()
         return True, "Account created successfully"
     
     except Exception as e:
@@ -58,17 +55,16 @@ def create_user(name, email, password):
 def authenticate_user(email, password):
     """Authenticate user login"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        hashed_password = hash_password(password)
-        cursor.execute("""
-            SELECT id, name, email FROM users 
-            WHERE email = ? AND password = ?
-        """, (email, hashed_password))
-        
-        user = cursor.fetchone()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            hashed_password = hash_password(password)
+            cursor.execute("""
+                SELECT id, name, email FROM users 
+                WHERE email = ? AND password = ?
+            """, (email, hashed_password))
+            
+            user = cursor.fetchone()
         
         if user:
             return True, {
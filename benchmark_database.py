@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+"""
+Database Benchmark Script for CitiZen AI
+Run this script to measure query latency and concurrency on a generated
+scratch database (the application database is never touched)
+"""
+
+import sys
+import os
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import utils.data_utils as data_utils
+from utils.data_utils import (
+    init_database, db_connection, close_db_connections, get_all_complaints, get_all_complaints_page,
+    get_complaints_by_status_page, get_complaint_queue, search_complaints, build_export_query, aggregate_params,
+    build_complaint_filters, URGENCY_RANK_SQL, URGENCY_RANKS, OPEN_STATUS, OPEN_STATUS_SQL, COMPLAINT_AGGREGATES,
+    COMPLAINT_CATEGORIES as CATEGORIES, COMPLAINT_STATUSES as STATUSES
+)
+
+URGENCIES = ['High', 'Medium', 'Low']
+WORDS = ['water', 'leak', 'pothole', 'garbage', 'streetlight', 'broken', 'overflow', 'tree', 'fallen',
+         'noise', 'traffic', 'drain', 'blocked', 'road', 'near', 'school', 'market', 'since', 'week', 'urgent']
+
+# What one agent dashboard render reads: the top of the queue and the status counts
+DASHBOARD_QUERIES = [
+    '''
+    SELECT id, user_id, category, description, address, landmark,
+           image_path, urgency, status, created_at, updated_at
+    FROM complaints
+    WHERE status != 'Resolved'
+    ORDER BY created_at DESC
+    LIMIT 50
+    ''',
+    'SELECT status, COUNT(*) FROM complaints GROUP BY status'
+]
+
+def make_benchmark_database(n_rows, seed=42):
+    """Create a scratch database with n_rows generated complaints
+
+    Returns the database path; data_utils is pointed at it so pooled
+    connections use it too.
+    """
+    directory = tempfile.mkdtemp(prefix="citizen_ai_bench_")
+    data_utils.DATABASE_PATH = os.path.join(directory, "complaints.db")
+    init_database()
+
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=365)
+
+    def rows():
+        for i in range(n_rows):
+            created_at = (start + timedelta(seconds=rng.randrange(365 * 86400))).isoformat()
+            description = ' '.join(rng.choice(WORDS) for _ in range(12))
+            yield (rng.randrange(1, 1000), rng.choice(CATEGORIES), description, f"{rng.randrange(1, 500)} Main Road",
+                   rng.choice(URGENCIES), rng.choice(STATUSES), created_at, created_at, description)
+
+    with db_connection() as conn:
+        conn.executemany('''
+            INSERT INTO complaints
+            (user_id, category, description, address, urgency, status, created_at, updated_at, combined_features)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows())
+
+    return data_utils.DATABASE_PATH
+
+def remove_benchmark_database(path):
+    """Close pooled connections and delete the scratch database"""
+    close_db_connections()
+    shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+def _read_dashboard(conn):
+    """Run the dashboard queries on a connection"""
+    for query in DASHBOARD_QUERIES:
+        conn.execute(query).fetchall()
+
+def _write_complaint(conn, rng):
+    """Insert one complaint and its history row"""
+    created_at = datetime.now().isoformat()
+    description = ' '.join(rng.choice(WORDS) for _ in range(12))
+    cursor = conn.execute('''
+        INSERT INTO complaints
+        (user_id, category, description, address, urgency, status, created_at, updated_at, combined_features)
+        VALUES (?, ?, ?, ?, ?, 'Pending', ?, ?, ?)
+    ''', (1, rng.choice(CATEGORIES), description, "1 Main Road", rng.choice(URGENCIES), created_at, created_at, description))
+    conn.execute('''
+        INSERT INTO complaint_history (complaint_id, old_status, new_status, changed_by, change_reason, changed_at)
+        VALUES (?, NULL, 'Pending', 'benchmark', 'Initial submission', ?)
+    ''', (cursor.lastrowid, created_at))
+
+def _legacy_connection(path):
+    """A connection opened the way every query used to: new, default settings"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return sqlite3.connect(path)
+
+def run_concurrent_workload(path, pooled, readers, seconds, write_interval_ms):
+    """Run reader threads and one writer thread for a fixed time
+
+    Returns (read latencies ms, write latencies ms, errors).
+    """
+    stop = threading.Event()
+    lock = threading.Lock()
+    read_timings, write_timings, errors = [], [], []
+
+    def timed(func, timings):
+        start = time.perf_counter()
+        try:
+            func()
+        except sqlite3.Error as e:
+            with lock:
+                errors.append(str(e))
+            return
+        with lock:
+            timings.append((time.perf_counter() - start) * 1000)
+
+    def read():
+        if pooled:
+            with db_connection() as conn:
+                _read_dashboard(conn)
+        else:
+            conn = _legacy_connection(path)
+            try:
+                _read_dashboard(conn)
+            finally:
+                conn.close()
+
+    def reader():
+        while not stop.is_set():
+            timed(read, read_timings)
+
+    def writer():
+        rng = random.Random(7)
+
+        def write():
+            if pooled:
+                with db_connection() as conn:
+                    _write_complaint(conn, rng)
+            else:
+                conn = _legacy_connection(path)
+                try:
+                    _write_complaint(conn, rng)
+                    conn.commit()
+                finally:
+                    conn.close()
+
+        while not stop.is_set():
+            timed(write, write_timings)
+            time.sleep(write_interval_ms / 1000)
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)] + [threading.Thread(target=writer)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return read_timings, write_timings, errors
+
+def _summarize(label, timings, seconds):
+    """One line of throughput and latency percentiles"""
+    if not timings:
+        return f"{label}: none completed"
+    return (f"{label}: {len(timings) / seconds:7.0f}/s, p50 {np.percentile(timings, 50):6.2f} ms, "
+            f"p95 {np.percentile(timings, 95):6.2f} ms, max {max(timings):7.1f} ms")
+
+def benchmark_concurrency(n_rows=20000, readers=4, seconds=5, write_interval_ms=10):
+    """Compare per-query connections in rollback-journal mode with pooled WAL connections"""
+    print("\n🔀 Concurrent dashboard readers + one complaint writer")
+    print("-" * 50)
+
+    path = make_benchmark_database(n_rows)
+    try:
+        results = {}
+        for label, pooled in (('Per-query connections, rollback journal', False), ('Pooled connections, WAL', True)):
+            close_db_connections()
+            conn = sqlite3.connect(path)
+            conn.execute(f"PRAGMA journal_mode = {'WAL' if pooled else 'DELETE'}")
+            conn.close()
+
+            results[label] = run_concurrent_workload(path, pooled, readers, seconds, write_interval_ms)
+
+        print(f"Rows: {n_rows}, {readers} readers, 1 writer (every {write_interval_ms} ms), {seconds}s per mode")
+        for label, (read_timings, write_timings, errors) in results.items():
+            print(f"   {label}")
+            print(f"      {_summarize('Dashboard reads', read_timings, seconds)}")
+            print(f"      {_summarize('Complaint writes', write_timings, seconds)}")
+            print(f"      Lock errors: {len(errors)}")
+    finally:
+        remove_benchmark_database(path)
+
+def _median_ms(func, repeats):
+    """Median wall time of func in milliseconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+def _offset_page(offset, page_size=50):
+    """The same page fetched with LIMIT/OFFSET, for comparison"""
+    with db_connection() as conn:
+        return conn.execute('''
+            SELECT id, user_id, category, description, address, landmark,
+                   image_path, urgency, status, created_at, updated_at
+            FROM complaints
+            ORDER BY urgency_rank, created_at, id
+            LIMIT ? OFFSET ?
+        ''', (page_size, offset)).fetchall()
+
+def benchmark_pagination(sizes=(10000, 100000, 1000000), repeats=20):
+    """Time keyset page fetches against OFFSET pages and loading the whole queue"""
+    print("\n📄 Keyset pagination vs OFFSET vs full queue load")
+    print("-" * 50)
+
+    for n_rows in sizes:
+        path = make_benchmark_database(n_rows)
+        try:
+            # Cursor of the row just before the middle of the queue
+            middle = n_rows // 2
+            with db_connection() as conn:
+                row = conn.execute('''
+                    SELECT urgency_rank, created_at, id FROM complaints
+                    ORDER BY urgency_rank, created_at, id
+                    LIMIT 1 OFFSET ?
+                ''', (middle - 1,)).fetchone()
+            cursor = tuple(row)
+
+            keyset_page = get_all_complaints_page(after=cursor)[0]
+            if [r[0] for r in keyset_page] != [r[0] for r in _offset_page(middle)]:
+                print(f"   ⚠️ Keyset and OFFSET pages differ at {n_rows} rows")
+
+            first = _median_ms(lambda: get_all_complaints_page(), repeats)
+            deep = _median_ms(lambda: get_all_complaints_page(after=cursor), repeats)
+            status_deep = _median_ms(lambda: get_complaints_by_status_page('Pending', after=cursor), repeats)
+            offset = _median_ms(lambda: _offset_page(middle), max(3, repeats // 4))
+            full = _median_ms(get_all_complaints, 3)
+
+            print(f"Rows: {n_rows}")
+            print(f"   Keyset first page {first:7.2f} ms, middle page {deep:7.2f} ms, "
+                  f"Pending middle page {status_deep:7.2f} ms")
+            print(f"   OFFSET middle page {offset:8.2f} ms, full get_all_complaints() {full:9.1f} ms")
+        finally:
+            remove_benchmark_database(path)
+
+# Agent queue filter combinations as (status, urgency, category)
+QUEUE_FILTERS = [
+    (None, None, None),
+    ('Pending', None, None),
+    (None, 'High', 'Roads & Potholes'),
+    ('In Progress', 'Medium', 'Water Supply Issues'),
+]
+
+def _pandas_queue(status, urgency, category):
+    """The queue as it used to be built: every complaint loaded, then filtered and counted in pandas"""
+    df = pd.DataFrame(get_all_complaints(), columns=[
+        'id', 'user_id', 'category', 'description', 'address', 'landmark',
+        'image_path', 'urgency', 'status', 'created_at', 'updated_at'
+    ])
+    status_counts = df['status'].value_counts().to_dict()
+    for column, value in (('status', status), ('urgency', urgency), ('category', category)):
+        if value:
+            df = df[df[column] == value]
+    return df.head(50), status_counts
+
+def benchmark_queue(sizes=(10000, 100000, 1000000), repeats=20):
+    """Time filtered agent queue renders: SQL query builder against loading everything into pandas"""
+    print("\n🎯 Filtered agent queue: get_complaint_queue() vs pandas filtering")
+    print("-" * 50)
+
+    for n_rows in sizes:
+        path = make_benchmark_database(n_rows)
+        try:
+            print(f"Rows: {n_rows}")
+            for status, urgency, category in QUEUE_FILTERS:
+                label = ' / '.join(value or 'All' for value in (status, urgency, category))
+                page_only = _median_ms(lambda: get_complaint_queue(status, urgency, category, include_counts=False), repeats)
+                with_counts = _median_ms(lambda: get_complaint_queue(status, urgency, category), repeats)
+                legacy = _median_ms(lambda: _pandas_queue(status, urgency, category), 3)
+                print(f"   {label:<45} page {page_only:6.2f} ms, page + tile counts {with_counts:7.2f} ms, "
+                      f"pandas {legacy:8.1f} ms")
+        finally:
+            remove_benchmark_database(path)
+
+# Search box terms: a common word, three words together, a word prefix and a rare house number.
+# Every generated description draws from the same 20 words, so the first three match a large
+# share of the table; real complaint text is far more selective.
+SEARCH_TERMS = ['pothole', 'garbage overflow school', 'stree', '417']
+
+def _like_search(term, limit=None, status=None):
+    """The search as it used to run: LIKE over three columns, newest first"""
+    with db_connection() as conn:
+        return conn.execute(f'''
+            SELECT id, user_id, category, description, address, landmark,
+                   image_path, urgency, status, created_at, updated_at
+            FROM complaints
+            WHERE (description LIKE ? OR address LIKE ? OR category LIKE ?)
+            {'AND status = ?' if status else ''}
+            ORDER BY created_at DESC
+            {'LIMIT ?' if limit else ''}
+        ''', [f'%{term}%'] * 3 + ([status] if status else []) + ([limit] if limit else [])).fetchall()
+
+def benchmark_search(sizes=(100000, 1000000), repeats=5, limit=50):
+    """Time search_complaints() over the FTS5 index against the LIKE scan
+
+    Compares the first page (FTS ranked by BM25, LIKE newest first) and the
+    full result set, which is what search_complaints() used to return.
+    """
+    print("\n🔎 Complaint search: FTS5 + BM25 vs LIKE")
+    print("-" * 50)
+
+    for n_rows in sizes:
+        path = make_benchmark_database(n_rows)
+        try:
+            print(f"Rows: {n_rows} (page = first {limit} results)")
+            for term in SEARCH_TERMS:
+                for status in (None, 'Pending'):
+                    label = f"'{term}'" + (f" + {status}" if status else "")
+                    filters = {'status': status} if status else None
+                    matches = len(search_complaints(term, filters))
+                    fts_page = _median_ms(lambda: search_complaints(term, filters, limit=limit), repeats)
+                    like_page = _median_ms(lambda: _like_search(term, limit, status), repeats)
+                    fts_all = _median_ms(lambda: search_complaints(term, filters), 3)
+                    like_all = _median_ms(lambda: _like_search(term, None, status), 3)
+                    print(f"   {label:<36} {matches:7} matches | page FTS {fts_page:7.1f} ms, LIKE {like_page:7.1f} ms"
+                          f" | all FTS {fts_all:7.1f} ms, LIKE {like_all:7.1f} ms")
+        finally:
+            remove_benchmark_database(path)
+
+# The date aggregates as one pass with DATE() and JULIANDAY(), which no index can answer
+LEGACY_AGGREGATES = '''
+    SELECT SUM(DATE(created_at) = :today), SUM(DATE(resolved_at) = :today), SUM(created_at >= :week_ago),
+           AVG(CASE WHEN status = 'Resolved' AND resolved_at IS NOT NULL
+                    THEN (JULIANDAY(resolved_at) - JULIANDAY(created_at)) * 24 END),
+           AVG(CASE WHEN status != 'Pending' THEN (JULIANDAY(updated_at) - JULIANDAY(created_at)) * 24 END)
+    FROM complaints
+'''
+
+def _legacy_export(date_from, status=None):
+    """The export query as it filtered dates before, on DATE(created_at)"""
+    query, params = build_export_query({'status': status})
+    query = query.replace(' ORDER BY', f" {'AND' if status else 'WHERE'} DATE(c.created_at) >= ? ORDER BY")
+    with db_connection() as conn:
+        return conn.execute(query, params + [date_from.isoformat()]).fetchall()
+
+def _export_rows(filters):
+    """Rows of the export query, without writing the CSV"""
+    query, params = build_export_query(filters)
+    with db_connection() as conn:
+        return conn.execute(query, params).fetchall()
+
+def _print_plan(label, query, params):
+    """Print the EXPLAIN QUERY PLAN steps of a query"""
+    with db_connection() as conn:
+        steps = [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {query}', params)]
+    print(f"   {label:<24} {'; '.join(steps)}")
+
+def benchmark_dates(sizes=(100000, 1000000), repeats=5):
+    """Time the date aggregates and a date-range export on the epoch columns against DATE()/JULIANDAY()
+
+    Complaints that are not pending get an updated_at up to two days after
+    creation, and resolved ones a resolved_at up to four days after.
+    """
+    print("\n📅 Date filters: epoch column ranges vs DATE()/JULIANDAY()")
+    print("-" * 50)
+
+    for n_rows in sizes:
+        path = make_benchmark_database(n_rows)
+        try:
+            with db_connection() as conn:
+                conn.execute('''
+                    UPDATE complaints
+                    SET updated_at = CASE WHEN status != 'Pending'
+                                          THEN strftime('%Y-%m-%dT%H:%M:%f', created_at, '+' || (id % 48) || ' hours')
+                                          ELSE updated_at END,
+                        resolved_at = CASE WHEN status = 'Resolved'
+                                           THEN strftime('%Y-%m-%dT%H:%M:%f', created_at, '+' || (id % 96) || ' hours') END
+                ''')
+
+            now = datetime.now()
+            legacy_params = {'today': now.date().isoformat(), 'week_ago': (now - timedelta(days=7)).isoformat()}
+            week_ago = (now - timedelta(days=7)).date()
+
+            def legacy_aggregates():
+                with db_connection() as conn:
+                    return conn.execute(LEGACY_AGGREGATES, legacy_params).fetchone()
+
+            def epoch_aggregates():
+                with db_connection() as conn:
+                    return conn.execute(
+                        f"SELECT {', '.join(f'({query})' for query in COMPLAINT_AGGREGATES.values())}", aggregate_params()
+                    ).fetchone()
+
+            print(f"Rows: {n_rows}")
+            print(f"   Aggregates              epoch {_median_ms(epoch_aggregates, repeats):8.1f} ms, "
+                  f"DATE/JULIANDAY {_median_ms(legacy_aggregates, repeats):8.1f} ms")
+            for status in (None, 'Pending'):
+                label = "Export 7 days" + (f" + {status}" if status else "")
+                rows = len(_export_rows({'date_from': week_ago, 'status': status}))
+                epoch_ms = _median_ms(lambda: _export_rows({'date_from': week_ago, 'status': status}), repeats)
+                legacy_ms = _median_ms(lambda: _legacy_export(week_ago, status), repeats)
+                print(f"   {label:<24} epoch {epoch_ms:8.1f} ms, DATE {legacy_ms:8.1f} ms ({rows} rows)")
+
+            if n_rows == sizes[0]:
+                print("   Query plans:")
+                for name, query in COMPLAINT_AGGREGATES.items():
+                    _print_plan(name, query, aggregate_params())
+                for status in (None, 'Pending'):
+                    _print_plan(f"export{' + ' + status if status else ''}",
+                                *build_export_query({'date_from': week_ago, 'status': status}))
+        finally:
+            remove_benchmark_database(path)
+
+# Queue views as (label, status, urgency): everything, the open queue, and one status and urgency
+PRIORITY_VIEWS = [
+    ('All', None, None),
+    (OPEN_STATUS, OPEN_STATUS, None),
+    ('Pending / High', 'Pending', 'High'),
+]
+
+def _case_sorted_page(status, urgency, limit):
+    """The queue page ordered by the CASE rank expression, which SQLite sorts row by row"""
+    conditions = []
+    params = []
+    if status == OPEN_STATUS:
+        conditions.append(OPEN_STATUS_SQL)
+    elif status:
+        conditions.append('status = ?')
+        params.append(status)
+    if urgency:
+        conditions.append('urgency = ?')
+        params.append(urgency)
+    query = f'''
+        SELECT id, user_id, category, description, address, landmark,
+               image_path, urgency, status, created_at, updated_at
+        FROM complaints
+        {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+        ORDER BY {URGENCY_RANK_SQL}, created_at, id
+        {'LIMIT ?' if limit else ''}
+    '''
+    with db_connection() as conn:
+        return conn.execute(query, params + ([limit] if limit else [])).fetchall()
+
+def benchmark_priority(sizes=(1000000,), repeats=20):
+    """Time queue pages read in urgency_rank index order against sorting on the CASE rank expression"""
+    print("\n🚦 Queue order: stored urgency_rank index vs CASE sort")
+    print("-" * 50)
+
+    for n_rows in sizes:
+        path = make_benchmark_database(n_rows)
+        try:
+            print(f"Rows: {n_rows}")
+            for label, status, urgency in PRIORITY_VIEWS:
+                first = get_complaint_queue(status, urgency, page_size=50, include_counts=False)
+                if [row[0] for row in first['complaints']] != [row[0] for row in _case_sorted_page(status, urgency, 50)]:
+                    print(f"   ⚠️ Index and CASE orders differ for {label}")
+                cursor = first['next_cursor']
+                page = _median_ms(lambda: get_complaint_queue(status, urgency, page_size=50, include_counts=False), repeats)
+                next_page = _median_ms(
+                    lambda: get_complaint_queue(status, urgency, after=cursor, page_size=50, include_counts=False), repeats
+                )
+                case_page = _median_ms(lambda: _case_sorted_page(status, urgency, 50), 3)
+                print(f"   {label:<16} first page {page:6.2f} ms, next page {next_page:6.2f} ms, "
+                      f"CASE sort first page {case_page:8.1f} ms")
+                conditions, params = build_complaint_filters(status, urgency)
+                query, query_params = data_utils._complaint_page_query(
+                    conditions, params, 'priority', cursor, 51, rank_pinned=urgency in URGENCY_RANKS
+                )
+                _print_plan(label, query, query_params)
+
+            full = _median_ms(get_all_complaints, 3)
+            case_full = _median_ms(lambda: _case_sorted_page(None, None, None), 3)
+            print(f"   Full queue: get_all_complaints() {full:8.1f} ms, CASE sort {case_full:8.1f} ms")
+            _print_plan('Full queue', 'SELECT id FROM complaints ORDER BY urgency_rank, created_at, id', [])
+            _print_plan('CASE sort', f'SELECT id FROM complaints ORDER BY {URGENCY_RANK_SQL}, created_at, id', [])
+        finally:
+            remove_benchmark_database(path)
+
+BENCHMARKS = ['concurrency', 'pagination', 'queue', 'search', 'dates', 'priority']
+
+def main():
+    """Run the selected database benchmarks"""
+    parser = argparse.ArgumentParser(description="CitiZen AI database benchmarks")
+    parser.add_argument(
+        'benchmarks', nargs='*', default=None,
+        help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: concurrency)"
+    )
+    parser.add_argument('--rows', type=int, default=20000, help="Complaints in the scratch database")
+    parser.add_argument('--readers', type=int, default=4, help="Concurrent reader threads")
+    parser.add_argument('--seconds', type=float, default=5, help="Duration of each concurrency run")
+    args = parser.parse_args()
+    # Choices are checked here: with nargs='*', Python 3.11 validates the
+    # empty list against choices and rejects running without arguments
+    args.benchmarks = args.benchmarks or ['concurrency']
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    print("⏱️ CitiZen AI Database Benchmarks")
+    print("=" * 50)
+
+    if 'concurrency' in args.benchmarks:
+        benchmark_concurrency(n_rows=args.rows, readers=args.readers, seconds=args.seconds)
+
+    if 'pagination' in args.benchmarks:
+        benchmark_pagination()
+
+    if 'queue' in args.benchmarks:
+        benchmark_queue()
+
+    if 'search' in args.benchmarks:
+        benchmark_search()
+
+    if 'dates' in args.benchmarks:
+        benchmark_dates()
+
+    if 'priority' in args.benchmarks:
+        benchmark_priority()
+
+if __name__ == "__main__":
+    main()
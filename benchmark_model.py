@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Model Benchmark Script for CitiZen AI
+Run this script to measure prediction latency and throughput
+"""
+
+import sys
+import os
+import time
+import argparse
+import random
+from contextlib import contextmanager
+
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import ml.model
+from ml.model import (
+    get_cached_model, get_cached_flat_forest, get_initial_training_data, predict_urgency, predict_urgency_batch,
+    evaluate_incremental_parity, apply_emergency_rules, apply_emergency_rules_batch,
+    rule_based_urgency_prediction, get_cascade_stats, reset_cascade_stats, get_prediction_cache_stats
+)
+from ml.tree_engine import flatten_forest, predict_proba_flat
+from utils.text_utils import create_features
+
+@contextmanager
+def model_settings(**settings):
+    """Temporarily override ml.model settings such as TREE_ENGINE or SERVING_MODEL"""
+    previous = {name: getattr(ml.model, name) for name in settings}
+    for name, value in settings.items():
+        setattr(ml.model, name, value)
+    # The served model is picked when a bundle is loaded, so reload it
+    if 'SERVING_MODEL' in settings:
+        ml.model._model_cache['entry'] = None
+
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(ml.model, name, value)
+        if 'SERVING_MODEL' in settings:
+            ml.model._model_cache['entry'] = None
+
+def make_benchmark_complaints(n_rows, seed=42):
+    """Create n_rows synthetic complaints by sampling the initial training patterns"""
+    patterns = get_initial_training_data()[['description', 'category']].values.tolist()
+    extra_words = ['near', 'market', 'school', 'since', 'yesterday', 'again', 'please', 'check', 'street', 'lane']
+
+    rng = random.Random(seed)
+    descriptions = []
+    categories = []
+    for _ in range(n_rows):
+        desc, cat = rng.choice(patterns)
+        descriptions.append(f"{desc} {' '.join(rng.sample(extra_words, 3))}")
+        categories.append(cat)
+
+    return descriptions, categories
+
+def benchmark_batch_prediction(sizes=(1000, 100000), loop_sample=500):
+    """Compare per-row cost of predict_urgency_batch against the single-row loop"""
+    print("\n📦 Batch vs single-row urgency prediction")
+    print("-" * 50)
+
+    # Warm the process-wide model cache so neither path pays the load
+    get_cached_model()
+
+    for n_rows in sizes:
+        descriptions, categories = make_benchmark_complaints(n_rows)
+
+        # The loop is too slow to run over every row at large sizes, so time a
+        # sample; the synthetic texts repeat, so bypass the prediction cache
+        sample = min(n_rows, loop_sample)
+        with model_settings(PREDICTION_CACHE_SIZE=0):
+            start = time.perf_counter()
+            loop_labels = [predict_urgency(d, c) for d, c in zip(descriptions[:sample], categories[:sample])]
+            loop_per_row = (time.perf_counter() - start) / sample
+
+        start = time.perf_counter()
+        result = predict_urgency_batch(descriptions, categories)
+        batch_per_row = (time.perf_counter() - start) / n_rows
+
+        agreement = (result['urgency'].iloc[:sample].tolist() == loop_labels)
+
+        print(f"Rows: {n_rows}")
+        print(f"   Loop:  {loop_per_row * 1000:.3f} ms/row (sampled {sample} rows)")
+        print(f"   Batch: {batch_per_row * 1000:.3f} ms/row")
+        print(f"   Speedup: {loop_per_row / batch_per_row:.1f}x, labels identical: {agreement}")
+
+def benchmark_prediction_cache(n_rows=2000, distinct_rows=200):
+    """Compare predict_urgency with the prediction cache cold, warm and disabled"""
+    print("\n🗃️ Prediction cache: hits vs misses")
+    print("-" * 50)
+
+    get_cached_model()
+    descriptions, categories = make_benchmark_complaints(distinct_rows, seed=11)
+    distinct = list(zip(descriptions, categories))
+    # Resubmissions: the same distinct texts drawn again in random order
+    rng = random.Random(11)
+    repeated = [rng.choice(distinct) for _ in range(n_rows)]
+
+    with model_settings(PREDICTION_CACHE_SIZE=0):
+        uncached_p50, uncached_p95 = _latency_percentiles(lambda row: predict_urgency(*row), repeated)
+        uncached_labels = [predict_urgency(*row) for row in distinct]
+
+    with model_settings(PREDICTION_CACHE_SIZE=max(ml.model.PREDICTION_CACHE_SIZE, distinct_rows)):
+        with ml.model._prediction_cache_lock:
+            ml.model._reset_prediction_cache(None)
+        before = get_prediction_cache_stats()
+        miss_p50, miss_p95 = _latency_percentiles(lambda row: predict_urgency(*row), distinct)
+        hit_p50, hit_p95 = _latency_percentiles(lambda row: predict_urgency(*row), repeated)
+        cached_labels = [predict_urgency(*row) for row in distinct]
+        after = get_prediction_cache_stats()
+
+    hits = after['hits'] - before['hits']
+    misses = after['misses'] - before['misses']
+
+    print(f"Distinct texts: {distinct_rows}, repeated lookups: {n_rows}")
+    print(f"   Cache disabled: p50 {uncached_p50:.3f} ms, p95 {uncached_p95:.3f} ms")
+    print(f"   Cache miss:     p50 {miss_p50:.3f} ms, p95 {miss_p95:.3f} ms")
+    print(f"   Cache hit:      p50 {hit_p50:.3f} ms, p95 {hit_p95:.3f} ms")
+    print(f"   Hit speedup: {uncached_p50 / hit_p50:.1f}x, hits {hits}, misses {misses}, "
+          f"labels identical: {cached_labels == uncached_labels}")
+
+def benchmark_incremental_parity():
+    """Report accuracy parity of incremental training against the full forest retrain"""
+    print("\n📈 Incremental training vs full forest retrain")
+    print("-" * 50)
+
+    report = evaluate_incremental_parity()
+
+    print(f"Train/test rows: {report['train_samples']}/{report['test_samples']}")
+    print(f"   Forest accuracy:      {report['forest_accuracy']:.3f} (fit {report['forest_fit_seconds']:.2f}s)")
+    print(f"   Incremental accuracy: {report['incremental_accuracy']:.3f} (fit {report['incremental_fit_seconds']:.2f}s)")
+    print(f"   Accuracy delta: {report['accuracy_delta']:+.3f}")
+    print(f"   Single-complaint predict: forest {report['forest_predict_ms']:.3f} ms, "
+          f"incremental {report['incremental_predict_ms']:.3f} ms")
+    print(f"   Hashed features: {report['hashing_features']} (CITIZEN_AI_HASHING_FEATURES); "
+          f"a larger space means fewer collisions but slower predict_proba")
+
+# Keyword lists and any() scans of the original list-based emergency rules,
+# kept here as the baseline for the compiled matcher
+LEGACY_EMERGENCY_KEYWORDS = [
+    'emergency', 'urgent', 'immediate', 'danger', 'dangerous', 'fire', 'accident',
+    'flood', 'flooding', 'overflow', 'burst', 'leak', 'gas', 'explosion',
+    'injured', 'hurt', 'bleeding', 'unconscious', 'trapped', 'collapse',
+    'sparking', 'shock', 'electrocution', 'fallen', 'blocking',
+    'contaminated', 'poisonous', 'toxic', 'disease', 'illness'
+]
+
+LEGACY_CATEGORY_KEYWORDS = {
+    'Public Safety & Security': ['crime', 'theft', 'violence', 'harassment', 'assault', 'suspicious'],
+    'Water Supply Issues': ['burst', 'flooding', 'contaminated', 'dirty', 'brown', 'smell'],
+    'Streetlight & Electricity': ['spark', 'wire', 'shock', 'burn', 'fire', 'exposed']
+}
+
+LEGACY_HIGH_URGENCY_WORDS = [
+    'emergency', 'urgent', 'immediate', 'danger', 'dangerous', 'fire', 'accident',
+    'flood', 'overflow', 'burst', 'leak', 'gas', 'sparking', 'broken', 'damaged',
+    'safety', 'hazard', 'risk', 'critical', 'serious', 'severe'
+]
+
+LEGACY_MEDIUM_URGENCY_WORDS = [
+    'problem', 'issue', 'concern', 'complaint', 'irregular', 'frequent',
+    'delay', 'slow', 'inconvenience', 'disturbance', 'poor', 'bad'
+]
+
+def legacy_emergency_rules(description, category, prediction, confidence):
+    """Original substring-scan emergency rules"""
+    desc_lower = description.lower()
+
+    if any(keyword in desc_lower for keyword in LEGACY_EMERGENCY_KEYWORDS):
+        return "High"
+
+    if any(word in desc_lower for word in LEGACY_CATEGORY_KEYWORDS.get(category, [])):
+        return "High"
+
+    if confidence < 0.5:
+        return "Medium"
+
+    return prediction
+
+def legacy_rule_based_prediction(description, category):
+    """Original substring-scan rule-based fallback"""
+    desc_lower = description.lower()
+
+    high_count = sum(1 for word in LEGACY_HIGH_URGENCY_WORDS if word in desc_lower)
+    medium_count = sum(1 for word in LEGACY_MEDIUM_URGENCY_WORDS if word in desc_lower)
+
+    if high_count >= 2 or any(word in desc_lower for word in ['emergency', 'danger', 'urgent']):
+        return "High"
+    elif high_count >= 1 or medium_count >= 2:
+        return "Medium"
+    else:
+        return "Low"
+
+def _time_per_row(func, rows):
+    """Run func over rows and return (results, microseconds per row)"""
+    start = time.perf_counter()
+    results = [func(*row) for row in rows]
+    return results, (time.perf_counter() - start) / len(rows) * 1e6
+
+def benchmark_keyword_matcher(n_rows=100000):
+    """Compare the compiled keyword matcher against the list-based substring scans"""
+    print("\n🔎 Compiled keyword matcher vs substring scans")
+    print("-" * 50)
+
+    descriptions, categories = make_benchmark_complaints(n_rows)
+    rows = list(zip(descriptions, categories))
+    rule_rows = [(d, c, "Low", 0.9) for d, c in rows]
+
+    legacy_rules, legacy_rules_us = _time_per_row(legacy_emergency_rules, rule_rows)
+    compiled_rules, compiled_rules_us = _time_per_row(apply_emergency_rules, rule_rows)
+
+    start = time.perf_counter()
+    batch_rules = apply_emergency_rules_batch(descriptions, categories, ["Low"] * n_rows, [0.9] * n_rows)
+    batch_rules_us = (time.perf_counter() - start) / n_rows * 1e6
+
+    legacy_fallback, legacy_fallback_us = _time_per_row(legacy_rule_based_prediction, rows)
+    compiled_fallback, compiled_fallback_us = _time_per_row(rule_based_urgency_prediction, rows)
+
+    changed_rules = sum(1 for old, new in zip(legacy_rules, compiled_rules) if old != new)
+    changed_fallback = sum(1 for old, new in zip(legacy_fallback, compiled_fallback) if old != new)
+
+    print(f"Rows: {n_rows}")
+    print(f"   Emergency rules:   substring {legacy_rules_us:.2f} us/row, "
+          f"compiled {compiled_rules_us:.2f} us/row, batch {batch_rules_us:.2f} us/row "
+          f"(batch matches per-row: {list(batch_rules) == compiled_rules})")
+    print(f"   Rule-based fallback: substring {legacy_fallback_us:.2f} us/row, "
+          f"compiled {compiled_fallback_us:.2f} us/row")
+    print(f"   Decisions changed by word-boundary matching: "
+          f"rules {changed_rules} ({changed_rules / n_rows:.2%}), fallback {changed_fallback} ({changed_fallback / n_rows:.2%})")
+
+def _latency_percentiles(func, rows):
+    """Call func once per row and return (p50, p95) latency in milliseconds"""
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        func(row)
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.percentile(timings, 50), np.percentile(timings, 95)
+
+def benchmark_tree_engine(n_rows=2000, latency_rows=300):
+    """Compare the flattened-array tree engine against sklearn for single complaints"""
+    print("\n🌲 Flat tree engine vs sklearn predict_proba")
+    print("-" * 50)
+
+    # The tree engine only scores a served forest, so serve it even if the
+    # bundle has a distilled student, and bypass the prediction cache so
+    # the second engine does not read the first one's answers
+    with model_settings(SERVING_MODEL='forest', PREDICTION_CACHE_SIZE=0):
+        _benchmark_tree_engine(n_rows, latency_rows)
+
+def _benchmark_tree_engine(n_rows, latency_rows):
+    """Run the tree engine benchmark against the served forest"""
+    model, vectorizer = get_cached_model()
+    if not hasattr(model, 'estimators_'):
+        print(f"The current bundle serves {type(model).__name__} and has no forest; retrain first")
+        return
+    flat_forest = get_cached_flat_forest() or flatten_forest(model)
+
+    descriptions, categories = make_benchmark_complaints(n_rows)
+    X = vectorizer.transform([create_features(d, c) for d, c in zip(descriptions, categories)])
+
+    # Parity over the whole sample, scored as one batch by both engines
+    sklearn_proba = model.predict_proba(X)
+    flat_proba = predict_proba_flat(flat_forest, X)
+    identical = np.array_equal(sklearn_proba, flat_proba)
+    max_diff = np.abs(sklearn_proba - flat_proba).max()
+
+    # Single-row latency as predict_urgency sees it: one sparse row per call
+    rows = [X[i] for i in range(min(n_rows, latency_rows))]
+    sklearn_p50, sklearn_p95 = _latency_percentiles(lambda row: (model.predict(row), model.predict_proba(row)), rows)
+    proba_p50, proba_p95 = _latency_percentiles(model.predict_proba, rows)
+    flat_p50, flat_p95 = _latency_percentiles(lambda row: predict_proba_flat(flat_forest, row), rows)
+
+    # End to end predict_urgency with each engine
+    sample = list(zip(descriptions, categories))[:latency_rows]
+    timings = {}
+    labels = {}
+    for engine in ('sklearn', 'flat'):
+        with model_settings(TREE_ENGINE=engine):
+            labels[engine] = [predict_urgency(d, c) for d, c in sample]
+            timings[engine] = _latency_percentiles(lambda row: predict_urgency(*row), sample)
+
+    print(f"Rows: {n_rows} ({len(flat_forest['forest_roots'])} trees, {len(flat_forest['forest_feature'])} nodes)")
+    print(f"   Probabilities identical: {identical} (max abs diff {max_diff:.3g})")
+    print(f"   sklearn predict + predict_proba: p50 {sklearn_p50:.3f} ms, p95 {sklearn_p95:.3f} ms")
+    print(f"   sklearn predict_proba only:      p50 {proba_p50:.3f} ms, p95 {proba_p95:.3f} ms")
+    print(f"   Flat engine:                     p50 {flat_p50:.3f} ms, p95 {flat_p95:.3f} ms")
+    print(f"   Speedup vs predict + predict_proba: {sklearn_p50 / flat_p50:.1f}x")
+    print(f"   predict_urgency p50: sklearn {timings['sklearn'][0]:.3f} ms, flat {timings['flat'][0]:.3f} ms, "
+          f"labels identical: {labels['sklearn'] == labels['flat']}")
+
+def benchmark_cascade(n_rows=2000):
+    """Report the tier mix and per-tier latency of the prediction cascade"""
+    print("\n🪜 Prediction cascade: rules -> linear -> forest")
+    print("-" * 50)
+
+    model, vectorizer = get_cached_model()
+    flat_forest = get_cached_flat_forest()
+    if flat_forest is None:
+        print("No forest arrays in the current bundle; retrain first")
+        return
+
+    descriptions, categories = make_benchmark_complaints(n_rows, seed=7)
+
+    # Reference: every complaint scored by the forest, then the emergency rules
+    X = vectorizer.transform([create_features(d, c) for d, c in zip(descriptions, categories)])
+    forest_proba = predict_proba_flat(flat_forest, X)
+    forest_labels = list(apply_emergency_rules_batch(
+        descriptions, categories, model.classes_[forest_proba.argmax(axis=1)], forest_proba.max(axis=1)
+    ))
+
+    previous_mode = ml.model.PREDICTION_MODE
+    try:
+        ml.model.PREDICTION_MODE = 'cascade'
+        reset_cascade_stats()
+        start = time.perf_counter()
+        cascade_labels = [predict_urgency(d, c) for d, c in zip(descriptions, categories)]
+        cascade_ms = (time.perf_counter() - start) / n_rows * 1000
+    finally:
+        ml.model.PREDICTION_MODE = previous_mode
+
+    stats = get_cascade_stats()
+    agreement = sum(1 for a, b in zip(cascade_labels, forest_labels) if a == b) / n_rows
+
+    print(f"Rows: {n_rows}, margin {stats['margin']}, served model {type(model).__name__}")
+    for tier, tier_stats in stats['tiers'].items():
+        if tier_stats['count']:
+            print(f"   {tier:<7} {tier_stats['fraction']:6.1%} of traffic, p50 {tier_stats['p50_ms']:.3f} ms, "
+                  f"p95 {tier_stats['p95_ms']:.3f} ms, p99 {tier_stats['p99_ms']:.3f} ms")
+        else:
+            print(f"   {tier:<7} no traffic")
+    print(f"   Mean latency: {cascade_ms:.3f} ms/complaint")
+    print(f"   Agreement with forest-only labels: {agreement:.2%}")
+
+BENCHMARKS = ['batch', 'cache', 'incremental', 'keywords', 'tree', 'cascade']
+
+def main():
+    """Run the selected model benchmarks"""
+    parser = argparse.ArgumentParser(description="CitiZen AI model benchmarks")
+    parser.add_argument(
+        'benchmarks', nargs='*', default=None,
+        help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: batch)"
+    )
+    args = parser.parse_args()
+    # Choices are checked here: with nargs='*', Python 3.11 validates the
+    # empty list against choices and rejects running without arguments
+    args.benchmarks = args.benchmarks or ['batch']
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    print("⏱️ CitiZen AI Model Benchmarks")
+    print("=" * 50)
+
+    if 'batch' in args.benchmarks:
+        benchmark_batch_prediction()
+
+    if 'cache' in args.benchmarks:
+        benchmark_prediction_cache()
+
+    if 'incremental' in args.benchmarks:
+        benchmark_incremental_parity()
+
+    if 'keywords' in args.benchmarks:
+        benchmark_keyword_matcher()
+
+    if 'tree' in args.benchmarks:
+        benchmark_tree_engine()
+
+    if 'cascade' in args.benchmarks:
+        benchmark_cascade()
+
+if __name__ == "__main__":
+    main()
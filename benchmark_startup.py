@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark Script for CitiZen AI
+Run this script to measure the import cost of the landing page with python -X importtime
+
+The "before" number is either measured on a checkout of an earlier commit
+(--baseline <commit>) or, without one, simulated by importing the current
+modules together with what main.py used to import eagerly.
+"""
+
+import sys
+import os
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+# Modules the landing page imports (main.py is importable without running the app)
+LANDING_IMPORTS = ["main"]
+
+# Simulated baseline: what main.py used to import eagerly, i.e. both
+# dashboards and, through them, scikit-learn, folium and streamlit_folium
+EAGER_IMPORTS = LANDING_IMPORTS + [
+    "dashboard.user_dashboard", "dashboard.agent_dashboard",
+    "sklearn.ensemble", "folium", "streamlit_folium"
+]
+
+# Heavy packages reported as loaded or not
+HEAVY_PACKAGES = ["pandas", "sklearn", "scipy", "folium", "streamlit_folium", "PIL"]
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def measure_imports(modules, cwd=PROJECT_DIR):
+    """Import modules in a fresh interpreter under -X importtime, from the project at cwd
+
+    Returns (total microseconds, {module: cumulative microseconds}, loaded heavy packages).
+    """
+    code = (
+        "import sys\n"
+        + "".join(f"import {module}\n" for module in modules)
+        + f"print(','.join(name for name in {HEAVY_PACKAGES!r} if name in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, capture_output=True, text=True
+    )
+
+    cumulative = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        # Lines look like "import time: <self us> | <cumulative us> | <indented module>"
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        if not cumulative_us.strip().isdigit():
+            continue
+        cumulative[module.strip()] = int(cumulative_us)
+        # Modules indented by a single space were imported directly, not by another module
+        if not module.startswith("  "):
+            total += int(cumulative_us)
+
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return total, cumulative, loaded
+
+def benchmark_startup(label, modules, runs, cwd=PROJECT_DIR):
+    """Measure one import set several times and print the median"""
+    totals = []
+    for _ in range(runs):
+        total, cumulative, loaded = measure_imports(modules, cwd)
+        totals.append(total)
+
+    heaviest = sorted(
+        ((name, us) for name, us in cumulative.items() if name.split(".")[0] in HEAVY_PACKAGES + ["streamlit", "numpy"] and "." not in name),
+        key=lambda item: -item[1]
+    )
+
+    print(f"\n{label}")
+    print("-" * 50)
+    print(f"   Import time: median {statistics.median(totals) / 1000:.0f} ms over {runs} runs "
+          f"(min {min(totals) / 1000:.0f} ms)")
+    print(f"   Heavy packages loaded: {', '.join(loaded) or 'none'}")
+    for name, us in heaviest[:6]:
+        print(f"      {name:<18} {us / 1000:7.0f} ms")
+
+    return statistics.median(totals)
+
+def export_commit(commit, directory):
+    """Extract the project tree of a git commit into directory"""
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", commit], cwd=PROJECT_DIR, capture_output=True, check=True
+    )
+    subprocess.run(["tar", "-x", "-C", directory], input=archive.stdout, check=True)
+
+def main():
+    """Compare the landing page imports with a baseline commit or the simulated eager imports"""
+    parser = argparse.ArgumentParser(description="CitiZen AI startup import benchmark")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument(
+        '--baseline', metavar='COMMIT',
+        help="Measure the landing page of this git commit as the baseline instead of simulating it"
+    )
+    args = parser.parse_args()
+
+    print("⏱️ CitiZen AI Startup Benchmark (python -X importtime)")
+    print("=" * 50)
+
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as checkout:
+            export_commit(args.baseline, checkout)
+            before = benchmark_startup(f"🐢 Landing page imports at {args.baseline} (measured)",
+                                       LANDING_IMPORTS, args.runs, cwd=checkout)
+    else:
+        before = benchmark_startup("🐢 Eager imports (SIMULATED: current modules plus dashboards, scikit-learn, folium)",
+                                   EAGER_IMPORTS, args.runs)
+    landing = benchmark_startup("🚀 Landing page imports", LANDING_IMPORTS, args.runs)
+
+    print(f"\nLanding page starts {before / landing:.1f}x faster ({(before - landing) / 1000:.0f} ms saved)")
+    if not args.baseline:
+        print("   The baseline is simulated; pass --baseline <commit> to measure an earlier checkout")
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,21 @@
 __version__ = "1.0.0"
 __author__ = "CitiZen AI Development Team"
 
-# Import main dashboard functions for easy access
-from .user_dashboard import show_user_dashboard
-from .agent_dashboard import show_agent_dashboard
+# Dashboards are imported on first access (see __getattr__) so loading one
+# page does not import the other page's dependencies
+_DASHBOARD_MODULES = {
+    'show_user_dashboard': '.user_dashboard',
+    'show_agent_dashboard': '.agent_dashboard'
+}
 
 __all__ = [
     'show_user_dashboard',
     'show_agent_dashboard'
-]
\ No newline at end of file
+]
+
+def __getattr__(name):
+    """Import a dashboard function from its module on first access"""
+    if name in __all__:
+        from importlib import import_module
+        return getattr(import_module(_DASHBOARD_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
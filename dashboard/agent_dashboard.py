@@ -1,11 +1,8 @@
 import streamlit as st
 import pandas as pd
-import folium
-from streamlit_folium import st_folium
 import sys
 import os
 from datetime import datetime, timedelta
-from PIL import Image
 import random
 
 # Add parent directory to path for imports
@@ -13,9 +10,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.data_utils import (
     get_all_complaints, update_complaint_status, get_complaint_stats,
-    get_complaints_by_status, get_db_connection
+    get_complaints_by_status, db_connection, get_duplicate_links,
+    get_complaint_queue, COMPLAINT_CATEGORIES, COMPLAINT_STATUSES, OPEN_STATUS, QUEUE_PAGE_SIZE
 )
-from ml.model import predict_resolution_time
+from ml.model import predict_resolution_time, predict_resolution_time_batch, get_model_info, get_retrain_status
 
 def show_agent_dashboard():
     """Display agent dashboard with complaint management interface"""
@@ -49,78 +47,112 @@ def show_complaint_queue():
     st.markdown("### 📋 **Complaint Management Queue**")
     st.markdown("Complaints are sorted by AI-predicted urgency and submission time.")
     
-    # Get all complaints
-    complaints = get_all_complaints()
-    
-    if not complaints:
-        st.info("🎉 No complaints in the system. Great job keeping the city clean!")
-        return
-    
-    # Convert to DataFrame for easier manipulation
-    df = pd.DataFrame(complaints, columns=[
-        'id', 'user_id', 'category', 'description', 'address', 'landmark', 
-        'image_path', 'urgency', 'status', 'created_at', 'updated_at'
-    ])
-    
-    # Quick stats
-    total_complaints = len(df)
-    pending_complaints = len(df[df['status'] == 'Pending'])
-    in_progress = len(df[df['status'] == 'In Progress'])
-    resolved = len(df[df['status'] == 'Resolved'])
-    
-    col1, col2, col3, col4, col5 = st.columns(5)
-    
-    with col1:
-        st.metric("📋 Total", total_complaints)
-    with col2:
-        st.metric("🔄 Pending", pending_complaints, delta=f"{pending_complaints-resolved}")
-    with col3:
-        st.metric("⚠️ In Progress", in_progress)
-    with col4:
-        st.metric("✅ Resolved", resolved)
-    with col5:
-        resolution_rate = (resolved / total_complaints * 100) if total_complaints > 0 else 0
-        st.metric("📈 Resolution %", f"{resolution_rate:.1f}%")
+    # Quick stats are filled in once the filtered queue has been queried
+    stats_container = st.container()
     
     st.markdown("---")
     
     # Filters
-    col_filter1, col_filter2, col_filter3 = st.columns(3)
+    col_filter1, col_filter2, col_filter3, col_filter4 = st.columns(4)
     
     with col_filter1:
-        status_filter = st.selectbox("Filter by Status", ["All", "Pending", "In Progress", "Resolved"])
+        status_filter = st.selectbox("Filter by Status", ["All", OPEN_STATUS] + COMPLAINT_STATUSES,
+                                     help=f"{OPEN_STATUS}: every complaint not yet resolved")
     
     with col_filter2:
         urgency_filter = st.selectbox("Filter by Urgency", ["All", "High", "Medium", "Low"])
     
     with col_filter3:
-        category_filter = st.selectbox("Filter by Category", ["All"] + list(df['category'].unique()))
+        category_filter = st.selectbox("Filter by Category", ["All"] + COMPLAINT_CATEGORIES)
+    
+    with col_filter4:
+        collapse_duplicates = st.checkbox("Collapse duplicates", value=True,
+                                          help="Hide complaints linked to another complaint shown in the queue")
+    
+    # Filtering, ordering and paging run in SQL. Only the number of rows loaded
+    # stays in the session: every run re-reads that many in one keyset query,
+    # so other agents' changes and new complaints show up, "Load more" adds a
+    # page and a change of filters starts again from the first page
+    filters = (status_filter, urgency_filter, category_filter)
+    if st.session_state.get('queue_filters') != filters:
+        st.session_state.queue_filters = filters
+        st.session_state.queue_rows = QUEUE_PAGE_SIZE
+    
+    queue = get_complaint_queue(
+        status=None if status_filter == "All" else status_filter,
+        urgency=None if urgency_filter == "All" else urgency_filter,
+        category=None if category_filter == "All" else category_filter,
+        page_size=max(st.session_state.queue_rows, QUEUE_PAGE_SIZE)
+    )
     
-    # Apply filters
-    filtered_df = df.copy()
+    status_counts = queue['status_counts']
+    total_complaints = queue['total']
+    pending_complaints = status_counts.get('Pending', 0)
+    in_progress = status_counts.get('In Progress', 0)
+    resolved = status_counts.get('Resolved', 0)
     
-    if status_filter != "All":
-        filtered_df = filtered_df[filtered_df['status'] == status_filter]
+    with stats_container:
+        col1, col2, col3, col4, col5 = st.columns(5)
+        
+        with col1:
+            st.metric("📋 Total", total_complaints)
+        with col2:
+            st.metric("🔄 Pending", pending_complaints, delta=f"{pending_complaints-resolved}")
+        with col3:
+            st.metric("⚠️ In Progress", in_progress)
+        with col4:
+            st.metric("✅ Resolved", resolved)
+        with col5:
+            resolution_rate = (resolved / total_complaints * 100) if total_complaints > 0 else 0
+            st.metric("📈 Resolution %", f"{resolution_rate:.1f}%")
+    
+    if not queue['complaints']:
+        if filters == ("All", "All", "All"):
+            st.info("🎉 No complaints in the system. Great job keeping the city clean!")
+        else:
+            st.info("No complaints match these filters.")
+        return
     
-    if urgency_filter != "All":
-        filtered_df = filtered_df[filtered_df['urgency'] == urgency_filter]
+    # Convert to DataFrame for easier manipulation
+    filtered_df = pd.DataFrame(queue['complaints'], columns=[
+        'id', 'user_id', 'category', 'description', 'address', 'landmark', 
+        'image_path', 'urgency', 'status', 'created_at', 'updated_at'
+    ])
     
-    if category_filter != "All":
-        filtered_df = filtered_df[filtered_df['category'] == category_filter]
+    # Fold linked duplicates into their original complaint's card when it is shown
+    duplicate_links = get_duplicate_links(filtered_df['id'].tolist())
+    duplicate_counts = {}
+    if collapse_duplicates and duplicate_links:
+        visible_ids = set(filtered_df['id'])
+        collapsed = [complaint_id for complaint_id in filtered_df['id']
+                     if duplicate_links.get(complaint_id) in visible_ids]
+        for complaint_id in collapsed:
+            original_id = duplicate_links[complaint_id]
+            duplicate_counts[original_id] = duplicate_counts.get(original_id, 0) + 1
+        filtered_df = filtered_df[~filtered_df['id'].isin(collapsed)]
     
-    # Sort by urgency priority and date
-    urgency_priority = {'High': 3, 'Medium': 2, 'Low': 1}
-    filtered_df['urgency_score'] = filtered_df['urgency'].map(urgency_priority)
-    filtered_df = filtered_df.sort_values(['urgency_score', 'created_at'], ascending=[False, True])
+    st.markdown(f"### 🎯 **Showing {len(filtered_df)} complaints**"
+                f"{' (more available below)' if queue['next_cursor'] is not None else ''}")
     
-    st.markdown(f"### 🎯 **Showing {len(filtered_df)} complaints**")
+    # Estimate resolution times for all visible cards in one call
+    estimated_times = predict_resolution_time_batch(filtered_df['category'], filtered_df['urgency'])
     
     # Display complaints
-    for idx, complaint in filtered_df.iterrows():
-        show_complaint_card(complaint)
+    for (idx, complaint), estimated_time in zip(filtered_df.iterrows(), estimated_times):
+        show_complaint_card(complaint, estimated_time,
+                            duplicate_count=duplicate_counts.get(complaint['id'], 0),
+                            duplicate_of=duplicate_links.get(complaint['id']))
+    
+    if queue['next_cursor'] is not None:
+        st.button("⬇️ Load more complaints", use_container_width=True, on_click=load_more_complaints)
+
+def load_more_complaints():
+    """Load one more page of the queue on the next run"""
+    st.session_state.queue_rows += QUEUE_PAGE_SIZE
 
-def show_complaint_card(complaint):
+def show_complaint_card(complaint, estimated_time=None, duplicate_count=0, duplicate_of=None):
     """Display individual complaint card with actions"""
+    from PIL import Image
     
     urgency_colors = {
         'High': '#ff4b4b',
@@ -134,8 +166,9 @@ def show_complaint_card(complaint):
         'Resolved': '#d4edda'
     }
     
-    # Predict resolution time
-    estimated_time = predict_resolution_time(complaint['description'], complaint['category'], complaint['urgency'])
+    # Predict resolution time unless the queue already estimated it
+    if estimated_time is None:
+        estimated_time = predict_resolution_time(complaint['description'], complaint['category'], complaint['urgency'])
     
     # Create compact complaint card
     with st.container():
@@ -200,6 +233,11 @@ def show_complaint_card(complaint):
             st.markdown(f"**⏱️ Est. Resolution:** {estimated_time}")
             st.markdown(f"**🎯 Priority Score:** {get_priority_score(complaint)}")
             
+            if duplicate_count:
+                st.markdown(f"**🔁 Duplicates:** {duplicate_count} linked complaint{'s' if duplicate_count > 1 else ''}")
+            elif duplicate_of is not None:
+                st.markdown(f"**🔁 Possible duplicate of:** #{duplicate_of}")
+            
             # Compact action buttons
             if complaint['status'] == 'Pending':
                 if st.button(f"🔧 Start Work", key=f"start_{complaint['id']}", use_container_width=True):
@@ -247,6 +285,10 @@ def get_priority_score(complaint):
 
 def show_complaint_map():
     """Display interactive map with complaint locations"""
+    # folium is only imported when the map tab is rendered
+    import folium
+    from streamlit_folium import st_folium
+    
     st.markdown("### 🗺️ **Complaint Location Map**")
     st.markdown("Interactive map showing all complaints with color-coded urgency levels.")
     
@@ -555,15 +597,8 @@ def show_analytics_dashboard():
         with col_chart1:
             st.markdown("**Complaints by Category**")
             
-            # Get category distribution
-            conn = get_db_connection()
-            category_df = pd.read_sql_query("""
-                SELECT category, COUNT(*) as count
-                FROM complaints
-                GROUP BY category
-                ORDER BY count DESC
-            """, conn)
-            conn.close()
+            # Category distribution from the complaint counters
+            category_df = pd.DataFrame(stats['category_distribution'], columns=['category', 'count'])
             
             if not category_df.empty:
                 st.bar_chart(category_df.set_index('category'))
@@ -573,20 +608,8 @@ def show_analytics_dashboard():
         with col_chart2:
             st.markdown("**Urgency Distribution**")
             
-            # Get urgency distribution
-            conn = get_db_connection()
-            urgency_df = pd.read_sql_query("""
-                SELECT urgency, COUNT(*) as count
-                FROM complaints
-                GROUP BY urgency
-                ORDER BY 
-                    CASE urgency 
-                        WHEN 'High' THEN 1 
-                        WHEN 'Medium' THEN 2 
-                        WHEN 'Low' THEN 3 
-                    END
-            """, conn)
-            conn.close()
+            # Urgency distribution from the complaint counters
+            urgency_df = pd.DataFrame(stats['urgency_distribution'], columns=['urgency', 'count'])
             
             if not urgency_df.empty:
                 st.bar_chart(urgency_df.set_index('urgency'))
@@ -596,14 +619,13 @@ def show_analytics_dashboard():
         # Recent activity
         st.markdown("#### 🕒 **Recent Activity**")
         
-        conn = get_db_connection()
-        recent_df = pd.read_sql_query("""
-            SELECT id, category, urgency, status, created_at
-            FROM complaints
-            ORDER BY created_at DESC
-            LIMIT 10
-        """, conn)
-        conn.close()
+        with db_connection() as conn:
+            recent_df = pd.read_sql_query("""
+                SELECT id, category, urgency, status, created_at
+                FROM complaints
+                ORDER BY created_at DESC
+                LIMIT 10
+            """, conn)
         
         if not recent_df.empty:
             st.dataframe(recent_df, use_container_width=True)
@@ -614,19 +636,18 @@ def show_analytics_dashboard():
         st.markdown("#### 👥 **Team Performance**")
         
         try:
-            conn = get_db_connection()
-            agent_perf = pd.read_sql_query("""
-                SELECT 
-                    a.name as agent_name,
-                    a.agent_id,
-                    COUNT(c.id) as total_handled,
-                    SUM(CASE WHEN c.status = 'Resolved' THEN 1 ELSE 0 END) as resolved_count
-                FROM agents a
-                LEFT JOIN complaints c ON c.assigned_agent = a.agent_id
-                GROUP BY a.id, a.name, a.agent_id
-                ORDER BY resolved_count DESC
-            """, conn)
-            conn.close()
+            with db_connection() as conn:
+                agent_perf = pd.read_sql_query("""
+                    SELECT 
+                        a.name as agent_name,
+                        a.agent_id,
+                        COUNT(c.id) as total_handled,
+                        SUM(CASE WHEN c.status = 'Resolved' THEN 1 ELSE 0 END) as resolved_count
+                    FROM agents a
+                    LEFT JOIN complaints c ON c.assigned_agent = a.agent_id
+                    GROUP BY a.id, a.name, a.agent_id
+                    ORDER BY resolved_count DESC
+                """, conn)
             
             if not agent_perf.empty:
                 st.dataframe(agent_perf, use_container_width=True)
@@ -658,24 +679,22 @@ def show_agent_settings():
     with col_info2:
         # Performance summary
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Get agent's resolved complaints
-            cursor.execute("""
-                SELECT COUNT(*) FROM complaints 
-                WHERE assigned_agent = ? AND status = 'Resolved'
-            """, (st.session_state.current_user['agent_id'],))
-            resolved_count = cursor.fetchone()[0]
-            
-            # Get total assigned
-            cursor.execute("""
-                SELECT COUNT(*) FROM complaints 
-                WHERE assigned_agent = ?
-            """, (st.session_state.current_user['agent_id'],))
-            total_assigned = cursor.fetchone()[0]
-            
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                # Get agent's resolved complaints
+                cursor.execute("""
+                    SELECT COUNT(*) FROM complaints 
+                    WHERE assigned_agent = ? AND status = 'Resolved'
+                """, (st.session_state.current_user['agent_id'],))
+                resolved_count = cursor.fetchone()[0]
+                
+                # Get total assigned
+                cursor.execute("""
+                    SELECT COUNT(*) FROM complaints 
+                    WHERE assigned_agent = ?
+                """, (st.session_state.current_user['agent_id'],))
+                total_assigned = cursor.fetchone()[0]
             
             st.success(f"""
             **Resolved Complaints:** {resolved_count}
@@ -720,7 +739,16 @@ def show_agent_settings():
     
     with st.expander("View System Status"):
         st.success("🟢 **System Status:** All services operational")
-        st.info("🤖 **AI Model:** Last trained with 150+ complaints")
+        model_info = get_model_info()
+        st.info(f"🤖 **AI Model:** Last trained {model_info['last_training']} with {model_info['total_samples']} samples")
+        
+        retrain_status = get_retrain_status()
+        if retrain_status['running']:
+            queued = " (another run queued)" if retrain_status['pending'] else ""
+            st.info(f"🔄 **Retraining:** In progress since {retrain_status['last_started']}{queued}")
+        elif retrain_status['last_finished']:
+            st.info(f"🔄 **Retraining:** Last run took {retrain_status['last_duration']:.1f}s, "
+                    f"last success {retrain_status['last_success'] or 'never'}")
         st.info("🗄️ **Database:** Connection healthy")
         st.info("📊 **Analytics:** Real-time data processing active")
         
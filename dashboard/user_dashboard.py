@@ -1,18 +1,19 @@
 import streamlit as st
 import os
 from datetime import datetime
-from PIL import Image
 import hashlib
 import sys
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.data_utils import add_complaint, get_user_complaints, get_db_connection
+from utils.data_utils import add_complaint, get_user_complaints, db_connection, get_status_counts, COMPLAINT_CATEGORIES
 from ml.model import predict_urgency, train_model_if_needed
 
 def save_uploaded_image(uploaded_file, complaint_type):
     """Save uploaded image and return file path"""
+    from PIL import Image
+    
     try:
         # Create directory if it doesn't exist
         os.makedirs("assets/uploaded_images", exist_ok=True)
@@ -42,14 +43,13 @@ def save_uploaded_image(uploaded_file, complaint_type):
 import streamlit as st
 import os
 from datetime import datetime
-from PIL import Image
 import hashlib
 import sys
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.data_utils import add_complaint, get_user_complaints, get_db_connection
+from utils.data_utils import add_complaint, get_user_complaints, db_connection, get_status_counts, COMPLAINT_CATEGORIES
 from ml.model import predict_urgency, train_model_if_needed
 
 def add_custom_css():
@@ -126,6 +126,8 @@ def show_user_dashboard():
 
 def show_complaint_form():
     """Display complaint submission form"""
+    from PIL import Image
+    
     st.markdown("### 📋 **Submit New Complaint**")
     st.markdown("Help us improve your city by reporting civic issues. Our AI will predict the urgency automatically.")
     
@@ -136,18 +138,7 @@ def show_complaint_form():
         with col1:
             category = st.selectbox(
                 "🏷️ **Complaint Category**",
-                options=[
-                    "Garbage & Waste Management",
-                    "Drainage & Water Logging",
-                    "Streetlight & Electricity",
-                    "Roads & Potholes",
-                    "Water Supply Issues",
-                    "Public Safety & Security",
-                    "Noise Pollution",
-                    "Tree Fall & Maintenance",
-                    "Traffic & Parking",
-                    "Other Municipal Issues"
-                ],
+                options=COMPLAINT_CATEGORIES,
                 help="Select the category that best describes your complaint"
             )
             
@@ -335,7 +326,7 @@ def show_complaint_form():
                     )
                     
                     if complaint_id:
-                        # Train model in background
+                        # Queue a retraining check on the background worker (returns immediately)
                         try:
                             train_model_if_needed()
                         except Exception as train_error:
@@ -400,11 +391,10 @@ def show_complaint_form():
                         with st.expander("🛠️ Debug Information"):
                             st.write("**Database Status:**")
                             try:
-                                conn = get_db_connection()
-                                cursor = conn.cursor()
-                                cursor.execute("SELECT COUNT(*) FROM complaints")
-                                count = cursor.fetchone()[0]
-                                conn.close()
+                                with db_connection() as conn:
+                                    cursor = conn.cursor()
+                                    cursor.execute("SELECT COUNT(*) FROM complaints")
+                                    count = cursor.fetchone()[0]
                                 st.success(f"✅ Database connection successful. Total complaints: {count}")
                             except Exception as db_error:
                                 st.error(f"❌ Database error: {db_error}")
@@ -418,6 +408,8 @@ def show_complaint_form():
 
 def show_user_complaints():
     """Display user's complaint history"""
+    from PIL import Image
+    
     st.markdown("### 📊 **My Complaint History**")
     
     # Get user complaints
@@ -625,18 +617,10 @@ def show_help_guidelines():
     st.markdown("### 📊 **Platform Statistics**")
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get total complaints
-        cursor.execute("SELECT COUNT(*) FROM complaints")
-        total = cursor.fetchone()[0]
-        
-        # Get resolved complaints
-        cursor.execute("SELECT COUNT(*) FROM complaints WHERE status = 'Resolved'")
-        resolved = cursor.fetchone()[0]
-        
-        conn.close()
+        # Totals come from the trigger-maintained complaint counters
+        status_counts = get_status_counts()
+        total = sum(status_counts.values())
+        resolved = status_counts['Resolved']
         
         col1, col2, col3 = st.columns(3)
         with col1:
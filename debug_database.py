@@ -11,8 +11,8 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from utils.data_utils import (
-    init_database, get_db_connection, add_complaint, 
-    get_all_complaints, test_database_connection
+    init_database, db_connection, add_complaint, 
+    get_all_complaints, test_database_connection, check_complaint_counters
 )
 from auth.user_auth import create_user
 from ml.model import predict_urgency
@@ -40,11 +40,10 @@ def create_test_complaint():
     
     try:
         # Get test user ID
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id FROM users WHERE email = 'test@example.com'")
-        user = cursor.fetchone()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM users WHERE email = 'test@example.com'")
+            user = cursor.fetchone()
         
         if not user:
             print("❌ Test user not found")
@@ -142,19 +141,17 @@ def main():
     # Test 6: Database statistics
     print("\n6️⃣ Testing database statistics...")
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM users")
-        user_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM complaints") 
-        complaint_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM complaint_history")
-        history_count = cursor.fetchone()[0]
-        
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("SELECT COUNT(*) FROM users")
+            user_count = cursor.fetchone()[0]
+            
+            cursor.execute("SELECT COUNT(*) FROM complaints") 
+            complaint_count = cursor.fetchone()[0]
+            
+            cursor.execute("SELECT COUNT(*) FROM complaint_history")
+            history_count = cursor.fetchone()[0]
         
         print(f"📊 Database Statistics:")
         print(f"   Users: {user_count}")
@@ -165,6 +162,17 @@ def main():
         print(f"❌ Error getting database statistics: {e}")
         return
     
+    # Test 7: Complaint counters match the complaints table
+    print("\n7️⃣ Checking complaint counters...")
+    mismatches = check_complaint_counters(repair=True)
+    if mismatches is None:
+        print("❌ Complaint counter check failed")
+        return
+    elif mismatches:
+        print(f"⚠️ {len(mismatches)} counter groups were out of date and have been rebuilt")
+    else:
+        print("✅ Complaint counters match the complaints table")
+    
     print("\n🎉 All database tests passed successfully!")
     print("✅ Database is working correctly")
     print("\n💡 You can now run: streamlit run main.py")
@@ -17,8 +17,6 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from auth.user_auth import show_user_auth
 from auth.agent_auth import show_agent_auth
-from dashboard.user_dashboard import show_user_dashboard
-from dashboard.agent_dashboard import show_agent_dashboard
 from utils.data_utils import init_database
 
 # Custom CSS for professional styling
@@ -290,6 +288,18 @@ def show_user_selection():
         </div>
         """, unsafe_allow_html=True)
 
+# Dashboards pull in pandas, scikit-learn, folium and PIL, so they are only
+# imported once a logged-in user opens one, not for the landing page
+def show_user_dashboard():
+    """Import and render the citizen dashboard"""
+    from dashboard.user_dashboard import show_user_dashboard as render_user_dashboard
+    render_user_dashboard()
+
+def show_agent_dashboard():
+    """Import and render the agent dashboard"""
+    from dashboard.agent_dashboard import show_agent_dashboard as render_agent_dashboard
+    render_agent_dashboard()
+
 def main():
     """Main application logic with routing"""
     
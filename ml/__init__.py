@@ -4,19 +4,26 @@
 __version__ = "1.0.0"
 __author__ = "CitiZen AI Development Team"
 
-# Import main ML functions for easy access
-from .model import (
-    predict_urgency,
-    predict_resolution_time,
-    train_model_if_needed,
-    get_model_info,
-    test_model
-)
-
+# Main ML functions are imported from .model on first access (see __getattr__),
+# so importing the package does not load pandas or scikit-learn
 __all__ = [
     'predict_urgency',
+    'predict_urgency_batch',
     'predict_resolution_time', 
+    'predict_resolution_time_batch',
     'train_model_if_needed',
+    'get_retrain_status',
     'get_model_info',
+    'get_model_cache_stats',
+    'get_prediction_server_status',
+    'get_cascade_stats',
+    'get_prediction_cache_stats',
     'test_model'
-]
\ No newline at end of file
+]
+
+def __getattr__(name):
+    """Import an ML function from .model on first access"""
+    if name in __all__:
+        from importlib import import_module
+        return getattr(import_module('.model', __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
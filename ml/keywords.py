@@ -0,0 +1,211 @@
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# Optional JSON override for the keyword table: {"group": ["keyword", ...], ...}
+KEYWORD_TABLE_PATH = os.path.join("ml", "urgency_keywords.json")
+
+# Keyword groups used by the emergency rules and the rule-based fallback.
+# Keywords match whole words, case-insensitively; a trailing '*' also matches
+# any word starting with the keyword (e.g. 'leak*' matches 'leaking').
+DEFAULT_KEYWORD_TABLE = {
+    # Critical emergency keywords - always high priority
+    'emergency': [
+        'emergency', 'urgent', 'immediate', 'danger*', 'fire', 'accident*',
+        'flood*', 'overflow*', 'burst*', 'leak*', 'gas', 'explosion*',
+        'injured', 'hurt', 'bleeding', 'unconscious', 'trapped', 'collaps*',
+        'sparking', 'shock*', 'electrocut*', 'fallen', 'blocking',
+        'contaminat*', 'poisonous', 'toxic', 'disease*', 'illness*'
+    ],
+    # Category-specific emergency keywords (see CATEGORY_EMERGENCY_GROUPS)
+    'safety_emergency': ['crime*', 'theft*', 'violen*', 'harass*', 'assault*', 'suspicious'],
+    'water_emergency': ['burst*', 'flood*', 'contaminat*', 'dirty', 'brown', 'smell*'],
+    'electrical_emergency': ['spark*', 'wire*', 'wiring', 'shock*', 'burn*', 'fire', 'exposed'],
+    # Rule-based fallback indicators
+    'critical': ['emergenc*', 'danger*', 'urgen*'],
+    'high_urgency': [
+        'emergency', 'urgent', 'immediate', 'danger*', 'fire', 'accident*',
+        'flood*', 'overflow*', 'burst*', 'leak*', 'gas', 'spark*', 'broken', 'damaged',
+        'safety', 'hazard*', 'risk*', 'critical', 'serious', 'severe'
+    ],
+    'medium_urgency': [
+        'problem*', 'issue*', 'concern*', 'complaint*', 'irregular*', 'frequent*',
+        'delay*', 'slow*', 'inconvenien*', 'disturb*', 'poor', 'bad'
+    ]
+}
+
+# Complaint category -> keyword group that forces High urgency for it
+CATEGORY_EMERGENCY_GROUPS = {
+    'Public Safety & Security': 'safety_emergency',
+    'Water Supply Issues': 'water_emergency',
+    'Streetlight & Electricity': 'electrical_emergency'
+}
+
+# Keyword groups read by the rule-based fallback
+FALLBACK_GROUPS = ('critical', 'high_urgency', 'medium_urgency')
+
+_matcher = None
+
+def load_keyword_table(path=KEYWORD_TABLE_PATH):
+    """Load the keyword table, applying groups from the JSON override if present"""
+    table = {group: list(keywords) for group, keywords in DEFAULT_KEYWORD_TABLE.items()}
+
+    try:
+        if os.path.exists(path):
+            with open(path) as f:
+                table.update(json.load(f))
+    except Exception as e:
+        print(f"Error loading keyword table {path}: {e}")
+
+    return table
+
+def _trie_pattern(words):
+    """Build a trie-shaped regex source matching any of words
+
+    Sharing common prefixes (e.g. 'co(?:llaps|mplaint|n(?:cern|taminat))')
+    keeps the regex engine from retrying every alternative at each position,
+    which a flat 'kw1|kw2|...' alternation would do. An empty word list
+    gives a pattern that never matches.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if '' in node:
+            branches.append('')
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return build(trie) if trie else "(?!)"
+
+def _shortest_stems(stems):
+    """Drop stems that a shorter stem already covers ('shock' covers 'shocking')"""
+    kept = []
+    for stem in sorted(stems):
+        if not kept or not stem.startswith(kept[-1]):
+            kept.append(stem)
+    return kept
+
+def _keyword_alternation(exact, stems):
+    """Regex source matching, at a word start, one exact keyword as the whole word or one stem"""
+    return _trie_pattern(exact) + r"\b|" + _trie_pattern(_shortest_stems(stems))
+
+def build_keyword_matcher(table):
+    """Compile a keyword table for group checks and keyword scans
+
+    Returns a dict holding one regex per group under 'search', which only
+    tells whether text hits the group, and each group's exact keywords and
+    prefix stems under 'words', from which keyword_scanner builds and caches
+    combined scans under 'scanners'. All match keywords as whole words of
+    lowercase text.
+    """
+    matcher = {'search': {}, 'words': {}, 'scanners': {}}
+    for group, keywords in table.items():
+        keywords = [keyword.lower() for keyword in keywords]
+        exact = {keyword for keyword in keywords if not keyword.endswith('*')}
+        stems = {keyword[:-1] for keyword in keywords if keyword.endswith('*')}
+        matcher['search'][group] = re.compile(r"\b(?:" + _keyword_alternation(exact, stems) + ")")
+        matcher['words'][group] = (exact, stems)
+
+    return matcher
+
+def keyword_scanner(groups=None, matcher=None):
+    """Get the single regex that finds the keywords of several groups in one pass
+
+    groups is a tuple of group names, or None for every group. One trie over
+    every keyword of the groups finds each keyword word, and one optional
+    lookahead per group, holding an exact and a stem capture, credits every
+    group the word belongs to. Returns (groups, pattern): pattern.findall()
+    yields one tuple per keyword word with two entries per group, the exact
+    keyword matched or the stem of the prefix keyword ('leak' for 'leak*').
+    """
+    matcher = matcher or get_keyword_matcher()
+
+    scanner = matcher['scanners'].get(groups)
+    if scanner is None:
+        names = tuple(group for group in (groups or matcher['words']) if group in matcher['words'])
+        words = [matcher['words'][group] for group in names]
+        any_keyword = _keyword_alternation(set().union(*(exact for exact, stems in words)),
+                                       set().union(*(stems for exact, stems in words)))
+        lookaheads = "".join(
+            rf"(?:(?=({_trie_pattern(exact)})\b|({_trie_pattern(_shortest_stems(stems))})))?" for exact, stems in words
+        )
+        scanner = (names, re.compile(r"\b(?=" + any_keyword + ")" + lookaheads + r"\w+"))
+        matcher['scanners'][groups] = scanner
+
+    return scanner
+
+def get_keyword_matcher():
+    """Get the process-wide compiled keyword matcher, building it on first use"""
+    global _matcher
+
+    if _matcher is None:
+        _matcher = build_keyword_matcher(load_keyword_table())
+
+    return _matcher
+
+def reload_keyword_matcher():
+    """Rebuild the matcher after the keyword table has been edited"""
+    global _matcher
+
+    _matcher = build_keyword_matcher(load_keyword_table())
+    return _matcher
+
+def match_keywords(text, groups=None, matcher=None):
+    """Find the keyword hits of a tuple of groups (all of them by default) in one pass
+
+    Returns a dict mapping each matched group to the set of its keywords
+    found ('leak*' for a prefix keyword).
+    """
+    matcher = matcher or get_keyword_matcher()
+    groups, scanner = keyword_scanner(groups, matcher)
+    hits = {}
+
+    if not text:
+        return hits
+
+    for found in scanner.findall(str(text).lower()):
+        for i, group in enumerate(groups):
+            exact, stem = found[2 * i], found[2 * i + 1]
+            if exact or stem:
+                hits.setdefault(group, set()).add(exact or stem + '*')
+
+    return hits
+
+def detect_emergency(text, category, matcher=None):
+    """Check text against the emergency group and the category's emergency group"""
+    matcher = matcher or get_keyword_matcher()
+    if not text:
+        return False
+
+    text = str(text).lower()
+    if matcher['search']['emergency'].search(text):
+        return True
+
+    category_group = CATEGORY_EMERGENCY_GROUPS.get(category)
+    return category_group is not None and matcher['search'][category_group].search(text) is not None
+
+def detect_emergency_batch(texts, categories, matcher=None):
+    """Vectorized detect_emergency: one str.contains scan per keyword group
+
+    Returns a boolean numpy array. Category groups only scan the rows of
+    their category that the emergency group did not already flag.
+    """
+    matcher = matcher or get_keyword_matcher()
+    texts = pd.Series(list(texts), dtype=object).fillna('').astype(str).str.lower()
+    categories = np.asarray(list(categories), dtype=object)
+
+    emergency = np.array(texts.str.contains(matcher['search']['emergency']), dtype=bool)
+    for category, group in CATEGORY_EMERGENCY_GROUPS.items():
+        rows = (categories == category) & ~emergency
+        if rows.any():
+            emergency[rows] = texts[rows].str.contains(matcher['search'][group])
+
+    return emergency
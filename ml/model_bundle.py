@@ -0,0 +1,204 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+from datetime import datetime
+
+import joblib
+import numpy as np
+
+# Versioned model bundles: ml/bundles/<version>/{manifest.json, objects.joblib, *.npy, *.joblib}
+# ml/bundles/CURRENT holds the version being served and is swapped atomically.
+BUNDLE_DIR = os.path.join("ml", "bundles")
+CURRENT_BUNDLE_PATH = os.path.join(BUNDLE_DIR, "CURRENT")
+MANIFEST_NAME = "manifest.json"
+OBJECTS_NAME = "objects.joblib"
+
+# Number of published bundles kept on disk (older ones are removed on publish)
+KEEP_BUNDLES = 3
+
+def new_bundle_version():
+    """Create a sortable, unique bundle version name"""
+    return f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}"
+
+def compute_feature_hash(vectorizer):
+    """Hash the vectorizer's parameters and vocabulary to identify its feature space"""
+    digest = hashlib.sha256()
+    digest.update(type(vectorizer).__name__.encode())
+    digest.update(repr(sorted(vectorizer.get_params().items(), key=lambda item: item[0])).encode())
+
+    vocabulary = getattr(vectorizer, 'vocabulary_', None)
+    if vocabulary:
+        digest.update(json.dumps(sorted((term, int(index)) for term, index in vocabulary.items())).encode())
+
+    return digest.hexdigest()[:16]
+
+def _fsync_directory(path):
+    """Flush directory entries so a rename survives a crash"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def atomic_dump(path, dump, mode='wb'):
+    """Write path by calling dump(file) on a temporary file, then renaming it into place
+
+    Readers see either the old file or the complete new one, never a
+    truncated write; the temporary file is removed if dump fails.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+
+    try:
+        with open(tmp_path, mode) as f:
+            dump(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    _fsync_directory(directory)
+    return path
+
+def atomic_write_json(path, data, **json_kwargs):
+    """Write data to path as JSON via atomic_dump"""
+    return atomic_dump(path, lambda f: json.dump(data, f, **json_kwargs), mode='w')
+
+def publish_bundle(objects, manifest, arrays=None, extra_objects=None):
+    """Write a bundle to a temporary directory, rename it into place and make it current
+
+    objects are pickled together with joblib; arrays are stored as
+    individual .npy files that every process maps from the page cache.
+    extra_objects
+    are pickled to their own files and only read by load_bundle_object.
+    Readers only ever see a complete bundle: the directory appears through
+    one rename and CURRENT is swapped through another.
+    """
+    os.makedirs(BUNDLE_DIR, exist_ok=True)
+
+    version = new_bundle_version()
+    tmp_dir = os.path.join(BUNDLE_DIR, f".tmp-{version}")
+    os.makedirs(tmp_dir)
+
+    try:
+        joblib.dump(objects, os.path.join(tmp_dir, OBJECTS_NAME))
+
+        for name, array in (arrays or {}).items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array))
+
+        for name, obj in (extra_objects or {}).items():
+            joblib.dump(obj, os.path.join(tmp_dir, f"{name}.joblib"))
+
+        manifest = dict(manifest)
+        manifest['version'] = version
+        manifest['created_at'] = datetime.now().isoformat()
+        manifest['arrays'] = sorted(arrays or {})
+        manifest['extra_objects'] = sorted(extra_objects or {})
+
+        with open(os.path.join(tmp_dir, MANIFEST_NAME), 'w') as f:
+            json.dump(manifest, f, indent=2, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.rename(tmp_dir, os.path.join(BUNDLE_DIR, version))
+        _fsync_directory(BUNDLE_DIR)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    atomic_dump(CURRENT_BUNDLE_PATH, lambda f: f.write(version.encode()))
+    remove_old_bundles(keep=KEEP_BUNDLES)
+
+    return version
+
+def get_current_bundle_version():
+    """Get the version named by CURRENT, or None if nothing has been published"""
+    try:
+        with open(CURRENT_BUNDLE_PATH) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def get_current_bundle_stamp():
+    """Get the inode and mtime of CURRENT, which change whenever a bundle is published, or None"""
+    try:
+        stat = os.stat(CURRENT_BUNDLE_PATH)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+def read_manifest(version=None):
+    """Read a bundle's manifest (the current bundle by default), or None"""
+    version = version or get_current_bundle_version()
+    if version is None:
+        return None
+
+    try:
+        with open(os.path.join(BUNDLE_DIR, version, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def load_bundle(version=None, mmap_mode='r'):
+    """Load a bundle (the current one by default)
+
+    Returns (version, objects, arrays, manifest). Only the arrays are
+    shared between processes: they are opened read-only with mmap_mode and
+    read from the page cache. The objects are unpickled into each process,
+    and sklearn copies every tree's node arrays onto the heap when a forest
+    is unpickled, so each process holds its own copy of a loaded forest.
+    """
+    version = version or get_current_bundle_version()
+    if version is None:
+        raise FileNotFoundError("No model bundle has been published")
+
+    path = os.path.join(BUNDLE_DIR, version)
+    manifest = read_manifest(version)
+    if manifest is None:
+        raise FileNotFoundError(f"Model bundle {version} has no manifest")
+
+    objects = joblib.load(os.path.join(path, OBJECTS_NAME), mmap_mode=mmap_mode)
+    arrays = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+        for name in manifest.get('arrays', [])
+    }
+
+    return version, objects, arrays, manifest
+
+def load_bundle_object(version, name, mmap_mode='r'):
+    """Load one of a bundle's extra objects"""
+    return joblib.load(os.path.join(BUNDLE_DIR, version, f"{name}.joblib"), mmap_mode=mmap_mode)
+
+def remove_old_bundles(keep=KEEP_BUNDLES):
+    """Delete all but the newest published bundles, never touching the current one"""
+    current = get_current_bundle_version()
+
+    try:
+        versions = sorted(
+            name for name in os.listdir(BUNDLE_DIR)
+            if not name.startswith('.') and os.path.isdir(os.path.join(BUNDLE_DIR, name))
+        )
+    except OSError:
+        return 0
+
+    removed = 0
+    for version in versions[:-keep] if keep > 0 else versions:
+        if version != current:
+            # Processes that still map these files keep them alive until they reload
+            shutil.rmtree(os.path.join(BUNDLE_DIR, version), ignore_errors=True)
+            removed += 1
+
+    return removed
@@ -0,0 +1,183 @@
+import os
+import json
+import sys
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_utils import db_connection
+from ml.model_bundle import atomic_write_json
+
+# Fitted lookup table: {"<category>|<urgency>": {"hours", "label", "samples", "source"}, ...}
+RESOLUTION_TABLE_PATH = os.path.join("ml", "resolution_times.json")
+
+# A (category, urgency) pair needs this many resolved complaints before its
+# observed median replaces the default estimate
+MIN_RESOLVED_SAMPLES = 5
+
+# Default resolution times (in hours), used until there is enough data
+DEFAULT_BASE_HOURS = {
+    'High': 24,    # 1 day
+    'Medium': 72,  # 3 days
+    'Low': 168     # 1 week
+}
+
+# Default category-specific time adjustments
+DEFAULT_CATEGORY_MULTIPLIERS = {
+    'Garbage & Waste Management': 0.5,      # Usually quick fixes
+    'Streetlight & Electricity': 0.8,       # Moderate complexity
+    'Water Supply Issues': 1.2,             # Can be complex
+    'Roads & Potholes': 1.5,               # Often require planning
+    'Drainage & Water Logging': 1.3,       # Weather dependent
+    'Public Safety & Security': 0.3,       # High priority, fast response
+    'Tree Fall & Maintenance': 1.0,        # Standard timing
+    'Traffic & Parking': 0.7,              # Administrative fixes
+    'Noise Pollution': 0.6,                # Usually quick resolution
+    'Other Municipal Issues': 1.0          # Average timing
+}
+
+_table_lock = threading.Lock()
+_table_cache = {'table': None, 'mtime': None}
+
+def format_resolution_hours(hours):
+    """Convert a number of hours to a human readable estimate"""
+    estimated_hours = int(hours)
+
+    if estimated_hours < 24:
+        return f"{estimated_hours} hours"
+    elif estimated_hours < 168:
+        days = estimated_hours // 24
+        return f"{days} day{'s' if days > 1 else ''}"
+    else:
+        weeks = estimated_hours // 168
+        return f"{weeks} week{'s' if weeks > 1 else ''}"
+
+def default_resolution_hours(category, urgency):
+    """Estimate from the default base times and category multipliers"""
+    return int(DEFAULT_BASE_HOURS.get(urgency, 72) * DEFAULT_CATEGORY_MULTIPLIERS.get(category, 1.0))
+
+def table_key(category, urgency):
+    """Lookup table key for a (category, urgency) pair"""
+    return f"{category}|{urgency}"
+
+def get_resolved_durations():
+    """Get category, urgency and resolution hours of every resolved complaint"""
+    with db_connection() as conn:
+        return pd.read_sql_query('''
+            SELECT category, urgency,
+                   (resolved_epoch - created_epoch) / 3600.0 AS hours
+            FROM complaints
+            WHERE status = 'Resolved' AND resolved_epoch >= created_epoch
+        ''', conn)
+
+def fit_resolution_table(durations=None, min_samples=MIN_RESOLVED_SAMPLES):
+    """Fit the lookup table from observed resolution durations
+
+    Each (category, urgency) pair gets the median of its resolved
+    complaints' durations once it has min_samples of them, and the default
+    estimate otherwise. Labels are precomputed so lookups do no work.
+    """
+    if durations is None:
+        durations = get_resolved_durations()
+
+    observed = {}
+    if not durations.empty:
+        grouped = durations.dropna().groupby(['category', 'urgency'])['hours']
+        for (category, urgency), hours in grouped:
+            observed[table_key(category, urgency)] = (float(hours.median()), len(hours))
+
+    categories = set(DEFAULT_CATEGORY_MULTIPLIERS) | set(durations['category'].dropna() if not durations.empty else [])
+
+    entries = {}
+    for category in sorted(categories):
+        for urgency in DEFAULT_BASE_HOURS:
+            key = table_key(category, urgency)
+            median_hours, samples = observed.get(key, (None, 0))
+
+            if samples >= min_samples:
+                # Estimates below one hour would read "0 hours"
+                hours, source = max(1.0, median_hours), 'data'
+            else:
+                hours, source = default_resolution_hours(category, urgency), 'default'
+
+            entries[key] = {
+                'hours': round(hours, 2),
+                'label': format_resolution_hours(hours),
+                'samples': samples,
+                'source': source
+            }
+
+    return {
+        'fitted_at': datetime.now().isoformat(),
+        'min_samples': min_samples,
+        'resolved_complaints': int(len(durations)),
+        'entries': entries
+    }
+
+def save_resolution_table(table, path=RESOLUTION_TABLE_PATH):
+    """Write the lookup table via a temporary file and an atomic rename"""
+    atomic_write_json(path, table, indent=2)
+
+def refresh_resolution_table():
+    """Refit the lookup table from the database, save it and serve it in this process"""
+    table = fit_resolution_table()
+    save_resolution_table(table)
+
+    with _table_lock:
+        _table_cache['table'] = table
+        _table_cache['mtime'] = _table_mtime()
+
+    fitted = sum(1 for entry in table['entries'].values() if entry['source'] == 'data')
+    print(f"✅ Resolution times refreshed: {fitted}/{len(table['entries'])} estimates from "
+          f"{table['resolved_complaints']} resolved complaints")
+    return table
+
+def _table_mtime(path=RESOLUTION_TABLE_PATH):
+    """Modification time of the saved table, or None if it does not exist"""
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+def get_resolution_table():
+    """Get the lookup table, loading it once and again only when the file changes
+
+    Returns None if no table has been fitted yet.
+    """
+    mtime = _table_mtime()
+    if _table_cache['table'] is not None and _table_cache['mtime'] == mtime:
+        return _table_cache['table']
+
+    with _table_lock:
+        if mtime is None:
+            return _table_cache['table']
+
+        try:
+            with open(RESOLUTION_TABLE_PATH) as f:
+                table = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading resolution table: {e}")
+            return _table_cache['table']
+
+        _table_cache['table'] = table
+        _table_cache['mtime'] = mtime
+        return table
+
+def lookup_resolution_time(category, urgency, table=None):
+    """Estimated resolution time label for a (category, urgency) pair"""
+    table = table if table is not None else get_resolution_table()
+
+    if table is not None:
+        entry = table['entries'].get(table_key(category, urgency))
+        if entry is not None:
+            return entry['label']
+
+    return format_resolution_hours(default_resolution_hours(category, urgency))
+
+def get_resolution_table_age():
+    """Seconds since the saved table was written, or None if there is none"""
+    mtime = _table_mtime()
+    return None if mtime is None else datetime.now().timestamp() - mtime
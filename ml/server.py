@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Local prediction server for CitiZen AI
+Owns the urgency model in one process and answers predict_urgency requests
+from all Streamlit workers, scoring concurrent requests in micro-batches.
+
+Run from the project root:
+    python -m ml.server --port 8765
+and start Streamlit with CITIZEN_AI_PREDICTION_SERVER=127.0.0.1:8765
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import deque
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ml.model import predict_urgency_many, get_cached_model, get_artifact_signature
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# A batch is scored once it is full or BATCH_WINDOW_MS after its first request arrived
+BATCH_WINDOW_MS = 5
+MAX_BATCH_SIZE = 64
+
+# Upper bounds of the batch-size histogram buckets (the last bucket is open-ended)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+# Longest a request handler waits for its batch before answering with an error
+REQUEST_TIMEOUT_SECONDS = 10
+
+class _PendingPrediction:
+    """One complaint waiting in the batch queue"""
+    __slots__ = ('description', 'category', 'done', 'urgency', 'error')
+
+    def __init__(self, description, category):
+        self.description = description
+        self.category = category
+        self.done = threading.Event()
+        self.urgency = None
+        self.error = None
+
+class MicroBatcher:
+    """Collects concurrent prediction requests and scores them together
+
+    Batches go through predict_urgency_many, so they use the same served
+    model, tree engine, prediction cache and cascade as predict_urgency.
+    """
+
+    def __init__(self, window_ms=BATCH_WINDOW_MS, max_batch_size=MAX_BATCH_SIZE):
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._stats_lock = threading.Lock()
+        self._stopped = False
+        self.stats = {
+            'started_at': datetime.now().isoformat(),
+            'requests': 0,
+            'predictions': 0,
+            'batches': 0,
+            'errors': 0,
+            'max_queue_depth': 0,
+            'batch_seconds_total': 0.0,
+            'batch_size_histogram': {_bucket_label(i): 0 for i in range(len(BATCH_SIZE_BUCKETS) + 1)}
+        }
+        self._worker = threading.Thread(target=self._run, name="prediction-batcher", daemon=True)
+
+    def start(self):
+        """Start the batching worker thread"""
+        self._worker.start()
+
+    def stop(self):
+        """Stop the worker once the queue is drained"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def submit(self, complaints):
+        """Queue complaints [(description, category), ...] and wait for their urgencies"""
+        pending = [_PendingPrediction(description, category) for description, category in complaints]
+
+        with self._condition:
+            self._queue.extend(pending)
+            depth = len(self._queue)
+            self._condition.notify()
+
+        with self._stats_lock:
+            self.stats['requests'] += 1
+            self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], depth)
+
+        for item in pending:
+            if not item.done.wait(REQUEST_TIMEOUT_SECONDS):
+                raise TimeoutError("Prediction batch did not complete in time")
+            if item.error is not None:
+                raise item.error
+
+        return [item.urgency for item in pending]
+
+    def queue_depth(self):
+        """Number of complaints currently waiting to be scored"""
+        with self._condition:
+            return len(self._queue)
+
+    def _next_batch(self):
+        """Block until a batch is ready: full, or the window since its first item has passed"""
+        with self._condition:
+            while not self._queue and not self._stopped:
+                self._condition.wait()
+            if not self._queue:
+                return None
+
+            deadline = time.monotonic() + self.window
+            while len(self._queue) < self.max_batch_size and not self._stopped:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            size = min(len(self._queue), self.max_batch_size)
+            return [self._queue.popleft() for _ in range(size)]
+
+    def _run(self):
+        """Worker loop: score each batch with one predict_urgency_many call"""
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            start = time.perf_counter()
+            try:
+                urgencies = predict_urgency_many([(item.description, item.category) for item in batch])
+                for item, urgency in zip(batch, urgencies):
+                    item.urgency = urgency
+            except Exception as e:
+                for item in batch:
+                    item.error = e
+                with self._stats_lock:
+                    self.stats['errors'] += 1
+            finally:
+                for item in batch:
+                    item.done.set()
+
+            with self._stats_lock:
+                self.stats['batches'] += 1
+                self.stats['predictions'] += len(batch)
+                self.stats['batch_seconds_total'] += time.perf_counter() - start
+                self.stats['batch_size_histogram'][_bucket_label(_bucket_index(len(batch)))] += 1
+
+    def get_stats(self):
+        """Snapshot of the batching counters, queue depth and batch-size histogram"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+            stats['batch_size_histogram'] = dict(self.stats['batch_size_histogram'])
+
+        stats['queue_depth'] = self.queue_depth()
+        stats['window_ms'] = self.window * 1000
+        stats['max_batch_size'] = self.max_batch_size
+        stats['mean_batch_size'] = stats['predictions'] / stats['batches'] if stats['batches'] else 0.0
+        stats['mean_batch_ms'] = stats['batch_seconds_total'] / stats['batches'] * 1000 if stats['batches'] else 0.0
+        del stats['batch_seconds_total']
+
+        return stats
+
+def _bucket_index(size):
+    """Histogram bucket for a batch size"""
+    for index, upper in enumerate(BATCH_SIZE_BUCKETS):
+        if size <= upper:
+            return index
+    return len(BATCH_SIZE_BUCKETS)
+
+def _bucket_label(index):
+    """Label of a histogram bucket, e.g. '1', '3-4', '65+'"""
+    if index == len(BATCH_SIZE_BUCKETS):
+        return f"{BATCH_SIZE_BUCKETS[-1] + 1}+"
+
+    lower = BATCH_SIZE_BUCKETS[index - 1] + 1 if index > 0 else 1
+    upper = BATCH_SIZE_BUCKETS[index]
+    return str(upper) if lower == upper else f"{lower}-{upper}"
+
+class PredictionRequestHandler(BaseHTTPRequestHandler):
+    """HTTP endpoints: POST /predict, GET /stats, GET /health"""
+
+    # Keep connections open so workers do not reconnect for every complaint
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY the body
+    # waits on the client's delayed ACK (~40 ms) on a kept-alive connection
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {'error': 'not found'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            complaints = [
+                (str(item.get('description', '')), str(item.get('category', '')))
+                for item in payload.get('complaints', [])
+            ]
+        except (ValueError, AttributeError) as e:
+            self._send_json(400, {'error': f"invalid request: {e}"})
+            return
+
+        try:
+            urgency = self.server.batcher.submit(complaints) if complaints else []
+        except Exception as e:
+            self._send_json(503, {'error': str(e)})
+            return
+
+        self._send_json(200, {'urgency': urgency, 'model_version': get_artifact_signature()})
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {'status': 'ok', 'model_version': get_artifact_signature()})
+        elif self.path == "/stats":
+            self._send_json(200, self.server.batcher.get_stats())
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate the output under load
+        pass
+
+def create_server(host=DEFAULT_HOST, port=DEFAULT_PORT, window_ms=BATCH_WINDOW_MS, max_batch_size=MAX_BATCH_SIZE):
+    """Create a prediction server with its micro-batcher started"""
+    server = ThreadingHTTPServer((host, port), PredictionRequestHandler)
+    server.daemon_threads = True
+    server.batcher = MicroBatcher(window_ms=window_ms, max_batch_size=max_batch_size)
+    server.batcher.start()
+    return server
+
+def main():
+    """Load the model and serve predictions until interrupted"""
+    parser = argparse.ArgumentParser(description="CitiZen AI local prediction server")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--window-ms', type=float, default=BATCH_WINDOW_MS, help="Micro-batch collection window")
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH_SIZE, help="Largest micro-batch")
+    args = parser.parse_args()
+
+    # Load the model before accepting requests so the first batch does not pay for it
+    get_cached_model()
+
+    server = create_server(args.host, args.port, args.window_ms, args.max_batch)
+    print(f"🚀 Prediction server listening on http://{args.host}:{args.port} "
+          f"(window {args.window_ms} ms, max batch {args.max_batch})")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Prediction server stopped")
+    finally:
+        server.batcher.stop()
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import numpy as np
+
+# Array names of a flattened forest as stored in a model bundle
+FOREST_ARRAY_NAMES = (
+    'forest_feature', 'forest_threshold', 'forest_left', 'forest_right', 'forest_value', 'forest_roots'
+)
+
+# Rows densified at a time when scoring a sparse batch
+PREDICT_CHUNK_SIZE = 256
+
+def flatten_forest(model):
+    """Export a fitted RandomForestClassifier's trees as contiguous arrays
+
+    The nodes of all trees are concatenated: child indices are offset to
+    point into the concatenated arrays (-1 marks a leaf), forest_roots
+    holds each tree's root node and forest_value each node's class
+    distribution, exactly as DecisionTreeClassifier.predict_proba returns it.
+    """
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        lefts.append(np.where(is_leaf, -1, tree.children_left + offset).astype(np.int32))
+        rights.append(np.where(is_leaf, -1, tree.children_right + offset).astype(np.int32))
+
+        value = tree.value[:, 0, :model.n_classes_].astype(np.float64)
+        if not np.allclose(value.sum(axis=1), 1.0):
+            # scikit-learn < 1.4 stores weighted counts and normalizes in predict_proba
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            value = value / normalizer
+        values.append(value)
+
+        roots.append(offset)
+        offset += tree.node_count
+
+    return {
+        'forest_feature': np.concatenate(features),
+        'forest_threshold': np.concatenate(thresholds),
+        'forest_left': np.concatenate(lefts),
+        'forest_right': np.concatenate(rights),
+        'forest_value': np.concatenate(values),
+        'forest_roots': np.array(roots, dtype=np.int32)
+    }
+
+def has_flat_forest(arrays):
+    """Check whether a bundle's arrays include a flattened forest"""
+    return all(name in arrays for name in FOREST_ARRAY_NAMES)
+
+def _predict_dense(forest, X):
+    """Walk every tree for every row of a dense float32 matrix at once"""
+    feature = forest['forest_feature']
+    threshold = forest['forest_threshold']
+    left = forest['forest_left']
+    right = forest['forest_right']
+    roots = forest['forest_roots']
+
+    rows = np.arange(X.shape[0])[:, np.newaxis]
+    nodes = np.repeat(roots[np.newaxis, :], X.shape[0], axis=0)
+
+    # One step down every tree per iteration until all rows sit on leaves
+    while True:
+        left_child = left[nodes]
+        active = left_child >= 0
+        if not active.any():
+            break
+        go_left = X[rows, feature[nodes]] <= threshold[nodes]
+        nodes = np.where(active, np.where(go_left, left_child, right[nodes]), nodes)
+
+    # Sum tree distributions in estimator order and average, as the forest does
+    return forest['forest_value'][nodes.T].sum(axis=0) / len(roots)
+
+def predict_proba_flat(forest, X, chunk_size=PREDICT_CHUNK_SIZE):
+    """Compute forest class probabilities from flattened arrays
+
+    X may be a sparse (e.g. TF-IDF) or dense matrix. Feature values are
+    compared as float32, the dtype sklearn's trees were fitted on, so the
+    result matches RandomForestClassifier.predict_proba.
+    """
+    n_rows = X.shape[0]
+    n_classes = forest['forest_value'].shape[1]
+    probabilities = np.empty((n_rows, n_classes), dtype=np.float64)
+
+    for start in range(0, n_rows, chunk_size):
+        chunk = X[start:start + chunk_size]
+        chunk = chunk.toarray() if hasattr(chunk, 'toarray') else np.asarray(chunk)
+        probabilities[start:start + chunk_size] = _predict_dense(forest, chunk.astype(np.float32))
+
+    return probabilities
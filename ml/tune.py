@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Hyperparameter search for the CitiZen AI urgency model
+Runs k-fold cross-validation over a parameter grid in a process pool and
+writes a ranked report; --write-config saves the best settings to
+ml/model_config.json, which retrain_model then uses.
+
+Run from the project root:
+    python -m ml.tune --folds 5 --jobs 4 --write-config
+"""
+
+import os
+import sys
+import json
+import time
+import pickle
+import shutil
+import hashlib
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.model_selection import StratifiedKFold
+from sklearn.metrics import accuracy_score, f1_score
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ml.model import (
+    MODEL_CONFIG_PATH, DEFAULT_VECTORIZER_PARAMS, DEFAULT_FOREST_PARAMS,
+    get_initial_training_data, get_training_window, build_vectorizer, build_forest
+)
+from ml.model_bundle import atomic_dump, atomic_write_json
+
+TUNING_REPORT_PATH = os.path.join("ml", "tuning_report.json")
+
+# Vectorized folds are cached here so candidates sharing vectorizer settings reuse them
+FOLD_CACHE_DIR = os.path.join("ml", ".tune_cache")
+
+# Default search space; every combination of vectorizer and forest settings is evaluated
+PARAM_GRID = {
+    'vectorizer': {
+        'max_features': [1000, 2000, 5000],
+        'ngram_range': [(1, 2), (1, 3)]
+    },
+    'forest': {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [10, 20, None],
+        'min_samples_leaf': [1, 2]
+    }
+}
+
+# Single-row predictions timed per fold for the latency column
+LATENCY_ROWS = 25
+
+def expand_grid(grid):
+    """Expand {'param': [values, ...]} into a list of parameter dicts"""
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+def load_tuning_data():
+    """Synthetic training data plus the training window of real complaints"""
+    initial_data = get_initial_training_data()[['combined_features', 'urgency']]
+    db_complaints, window_stats = get_training_window()
+
+    data = pd.concat([initial_data, db_complaints[['combined_features', 'urgency']]], ignore_index=True)
+    return data.reset_index(drop=True), window_stats
+
+def _params_key(params):
+    """Stable short hash of a parameter dict"""
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+def cache_vectorized_folds(data, vectorizer_params, folds, seed=42, cache_dir=FOLD_CACHE_DIR):
+    """Fit the vectorizer on each training fold and cache the transformed folds
+
+    Returns the list of fold file paths. Folds already cached for the same
+    data, settings and split are reused.
+    """
+    data_hash = hashlib.sha256(pd.util.hash_pandas_object(data, index=False).values.tobytes()).hexdigest()[:12]
+    fold_dir = os.path.join(cache_dir, f"{data_hash}-{folds}-{seed}-{_params_key(vectorizer_params)}")
+    os.makedirs(fold_dir, exist_ok=True)
+
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+    paths = []
+
+    for fold, (train_index, test_index) in enumerate(splitter.split(data['combined_features'], data['urgency'])):
+        path = os.path.join(fold_dir, f"fold_{fold}.joblib")
+        paths.append(path)
+        if os.path.exists(path):
+            continue
+
+        vectorizer = build_vectorizer(vectorizer_params)
+        X_train = vectorizer.fit_transform(data['combined_features'].iloc[train_index])
+        X_test = vectorizer.transform(data['combined_features'].iloc[test_index])
+
+        fold_data = {
+            'X_train': X_train, 'y_train': data['urgency'].iloc[train_index].to_numpy(),
+            'X_test': X_test, 'y_test': data['urgency'].iloc[test_index].to_numpy()
+        }
+        atomic_dump(path, lambda f: joblib.dump(fold_data, f))
+
+    return paths
+
+def evaluate_candidate(vectorizer_params, forest_params, fold_paths):
+    """Cross-validate one forest configuration on cached vectorized folds
+
+    Runs in a worker process; returns mean/std accuracy, macro F1, fit
+    time, single-row predict latency and serialized model size.
+    """
+    accuracies, f1_scores, fit_times, latencies, sizes = [], [], [], [], []
+
+    for path in fold_paths:
+        fold = joblib.load(path)
+
+        forest = build_forest(forest_params)
+        started = time.perf_counter()
+        forest.fit(fold['X_train'], fold['y_train'])
+        fit_times.append(time.perf_counter() - started)
+
+        predictions = forest.predict(fold['X_test'])
+        accuracies.append(accuracy_score(fold['y_test'], predictions))
+        f1_scores.append(f1_score(fold['y_test'], predictions, average='macro'))
+
+        timings = []
+        for i in range(min(LATENCY_ROWS, fold['X_test'].shape[0])):
+            started = time.perf_counter()
+            forest.predict_proba(fold['X_test'][i])
+            timings.append((time.perf_counter() - started) * 1000)
+        latencies.append(np.median(timings))
+
+        sizes.append(len(pickle.dumps(forest, protocol=pickle.HIGHEST_PROTOCOL)))
+
+    return {
+        'vectorizer': vectorizer_params,
+        'forest': forest_params,
+        'accuracy_mean': float(np.mean(accuracies)),
+        'accuracy_std': float(np.std(accuracies)),
+        'f1_macro_mean': float(np.mean(f1_scores)),
+        'fit_seconds_mean': float(np.mean(fit_times)),
+        'predict_latency_ms': float(np.mean(latencies)),
+        'model_size_bytes': int(np.mean(sizes))
+    }
+
+def run_search(data, folds=5, jobs=None, grid=PARAM_GRID, seed=42):
+    """Evaluate every grid candidate across a process pool and rank the results
+
+    Results are ranked by mean accuracy, then macro F1, then fit time.
+    """
+    vectorizer_candidates = [
+        dict(DEFAULT_VECTORIZER_PARAMS, **params) for params in expand_grid(grid['vectorizer'])
+    ]
+    forest_candidates = [
+        dict(DEFAULT_FOREST_PARAMS, **params) for params in expand_grid(grid['forest'])
+    ]
+
+    # Vectorize each fold once per vectorizer setting, before any forest is fitted
+    fold_paths = {}
+    for vectorizer_params in vectorizer_candidates:
+        fold_paths[_params_key(vectorizer_params)] = cache_vectorized_folds(data, vectorizer_params, folds, seed)
+
+    results = []
+    total = len(vectorizer_candidates) * len(forest_candidates)
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(evaluate_candidate, vectorizer_params, forest_params, fold_paths[_params_key(vectorizer_params)])
+            for vectorizer_params in vectorizer_candidates
+            for forest_params in forest_candidates
+        ]
+        for future in as_completed(futures):
+            results.append(future.result())
+            print(f"   {len(results)}/{total} candidates evaluated", end="\r")
+
+    print()
+    results.sort(key=lambda r: (-r['accuracy_mean'], -r['f1_macro_mean'], r['fit_seconds_mean']))
+    for rank, result in enumerate(results, start=1):
+        result['rank'] = rank
+
+    return results
+
+def print_report(results, top=10):
+    """Print the ranked candidates as a table"""
+    print(f"\n{'Rank':>4}  {'Accuracy':>15}  {'F1':>6}  {'Fit s':>6}  {'Pred ms':>7}  {'Size KB':>8}  Settings")
+    for result in results[:top]:
+        vectorizer = result['vectorizer']
+        forest = result['forest']
+        settings = (f"features={vectorizer['max_features']} ngrams={tuple(vectorizer['ngram_range'])} "
+                    f"trees={forest['n_estimators']} depth={forest['max_depth']} leaf={forest['min_samples_leaf']}")
+        print(f"{result['rank']:>4}  {result['accuracy_mean']:.3f} ± {result['accuracy_std']:.3f}  "
+              f"{result['f1_macro_mean']:.3f}  {result['fit_seconds_mean']:6.2f}  {result['predict_latency_ms']:7.2f}  "
+              f"{result['model_size_bytes'] / 1024:8.0f}  {settings}")
+
+def write_report(results, folds, n_rows, window_stats, path=TUNING_REPORT_PATH):
+    """Save the ranked results as JSON"""
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'folds': folds,
+        'rows': n_rows,
+        'training_window': window_stats,
+        'results': results
+    }
+    return atomic_write_json(path, report, indent=2, default=list)
+
+def write_model_config(result, path=MODEL_CONFIG_PATH):
+    """Save a candidate's settings as the model config used by retrain_model"""
+    config = {
+        'vectorizer': result['vectorizer'],
+        'forest': result['forest'],
+        'tuned_at': datetime.now().isoformat(),
+        'cv_accuracy': result['accuracy_mean']
+    }
+    return atomic_write_json(path, config, indent=2, default=list)
+
+def main():
+    """Run the search from the command line"""
+    parser = argparse.ArgumentParser(description="CitiZen AI urgency model hyperparameter search")
+    parser.add_argument('--folds', type=int, default=5, help="Cross-validation folds")
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--top', type=int, default=10, help="Candidates shown in the printed report")
+    parser.add_argument('--write-config', action='store_true', help=f"Save the best settings to {MODEL_CONFIG_PATH}")
+    parser.add_argument('--clear-cache', action='store_true', help="Delete cached vectorized folds first")
+    args = parser.parse_args()
+
+    if args.clear_cache:
+        shutil.rmtree(FOLD_CACHE_DIR, ignore_errors=True)
+
+    print("🔬 CitiZen AI Hyperparameter Search")
+    print("=" * 50)
+
+    data, window_stats = load_tuning_data()
+    print(f"Rows: {len(data)} ({window_stats['rows_used']} real complaints), {args.folds} folds")
+
+    started = time.perf_counter()
+    results = run_search(data, folds=args.folds, jobs=args.jobs)
+    print(f"⏱️ Evaluated {len(results)} candidates in {time.perf_counter() - started:.1f}s")
+
+    print_report(results, top=args.top)
+    print(f"\n📄 Report written to {write_report(results, args.folds, len(data), window_stats)}")
+
+    if args.write_config and results:
+        print(f"✅ Best settings saved to {write_model_config(results[0])}")
+
+if __name__ == "__main__":
+    main()
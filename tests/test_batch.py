@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ml.model as model_module
+from ml.model import get_initial_training_data, build_vectorizer, build_forest, publish_model, predict_urgency_batch
+
+@pytest.fixture
+def published_forest(tmp_path, monkeypatch):
+    """Publish a small forest into a scratch directory with no prediction server"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(model_module, 'PREDICTION_SERVER', None)
+    monkeypatch.setitem(model_module._model_cache, 'entry', None)
+
+    data = get_initial_training_data()
+    vectorizer = build_vectorizer()
+    forest = build_forest()
+    forest.fit(vectorizer.fit_transform(data['combined_features']), data['urgency'])
+    publish_model(forest, vectorizer, {})
+
+def test_batch_without_categories(published_forest):
+    descriptions = ["water meter reading request schedule visit", "road marking paint faded renewal needed"]
+
+    result = predict_urgency_batch(descriptions)
+    expected = predict_urgency_batch(descriptions, ['', ''])
+
+    assert list(result['urgency']) == list(expected['urgency'])
+    assert set(result['urgency']) <= {'High', 'Medium', 'Low'}
@@ -0,0 +1,112 @@
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ml.model as model_module
+from ml.model import (
+    get_initial_training_data, build_vectorizer, build_forest, build_hashing_vectorizer,
+    build_incremental_model, partial_fit_epochs, fit_student, publish_model, predict_urgency,
+    get_cascade_stats, reset_cascade_stats
+)
+
+# Complaints that no emergency rule answers, so every one reaches a model tier
+COMPLAINTS = [
+    ("park maintenance grass cutting required", "Other Municipal Issues"),
+    ("water meter reading request schedule visit", "Water Supply Issues"),
+    ("road marking paint faded renewal needed", "Roads & Potholes"),
+    ("parking space insufficient residential area", "Traffic & Parking")
+]
+
+@pytest.fixture
+def bundle_dir(tmp_path, monkeypatch):
+    """Publish bundles into a scratch directory with the cascade enabled and no prediction cache"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(model_module, 'PREDICTION_MODE', 'cascade')
+    monkeypatch.setattr(model_module, 'PREDICTION_CACHE_SIZE', 0)
+    monkeypatch.setattr(model_module, 'PREDICTION_SERVER', None)
+    monkeypatch.setattr(model_module, 'SERVING_MODEL', 'student')
+    monkeypatch.setitem(model_module._model_cache, 'entry', None)
+    return tmp_path
+
+@pytest.fixture(scope='module')
+def trained():
+    """A forest, its distilled student and the vectorizer they share"""
+    data = get_initial_training_data()
+    vectorizer = build_vectorizer()
+    X = vectorizer.fit_transform(data['combined_features'])
+    forest = build_forest()
+    forest.fit(X, data['urgency'])
+    return forest, fit_student(forest, X), vectorizer
+
+def cascade_tiers(margin, monkeypatch):
+    """Predict every complaint from the published bundle, read back from disk; return tier counts"""
+    monkeypatch.setattr(model_module, 'CASCADE_MARGIN', margin)
+    model_module._model_cache['entry'] = None
+    reset_cascade_stats()
+
+    for description, category in COMPLAINTS:
+        assert predict_urgency(description, category) in ('High', 'Medium', 'Low')
+
+    return {tier: stats['count'] for tier, stats in get_cascade_stats()['tiers'].items()}
+
+def test_student_served_with_forest(bundle_dir, trained, monkeypatch):
+    forest, student, vectorizer = trained
+    publish_model(forest, vectorizer, {}, student=student, serve_student=True)
+
+    assert cascade_tiers(0.0, monkeypatch)['linear'] == len(COMPLAINTS)
+    assert cascade_tiers(1.1, monkeypatch)['forest'] == len(COMPLAINTS)
+
+def test_forest_served_with_student(bundle_dir, trained, monkeypatch):
+    forest, student, vectorizer = trained
+    publish_model(forest, vectorizer, {}, student=student, serve_student=True)
+    monkeypatch.setattr(model_module, 'SERVING_MODEL', 'forest')
+
+    assert cascade_tiers(0.0, monkeypatch)['linear'] == len(COMPLAINTS)
+    assert cascade_tiers(1.1, monkeypatch)['forest'] == len(COMPLAINTS)
+    assert type(model_module.get_cached_model()[0]).__name__ == 'RandomForestClassifier'
+
+def test_rejected_student_kept_for_cascade(bundle_dir, trained, monkeypatch):
+    forest, student, vectorizer = trained
+    publish_model(forest, vectorizer, {}, student=student, serve_student=False)
+
+    assert cascade_tiers(0.0, monkeypatch)['linear'] == len(COMPLAINTS)
+    assert cascade_tiers(1.1, monkeypatch)['forest'] == len(COMPLAINTS)
+    assert type(model_module.get_cached_model()[0]).__name__ == 'RandomForestClassifier'
+
+def test_forest_only(bundle_dir, trained, monkeypatch):
+    forest, student, vectorizer = trained
+    publish_model(forest, vectorizer, {})
+
+    tiers = cascade_tiers(0.0, monkeypatch)
+    assert tiers['linear'] == 0
+    assert tiers['forest'] == len(COMPLAINTS)
+
+def test_incremental_linear_only(bundle_dir, monkeypatch):
+    data = get_initial_training_data()
+    vectorizer = build_hashing_vectorizer()
+    model = build_incremental_model()
+    partial_fit_epochs(model, vectorizer.transform(data['combined_features']), data['urgency'])
+    publish_model(model, vectorizer, {})
+
+    tiers = cascade_tiers(1.1, monkeypatch)
+    assert tiers['linear'] == len(COMPLAINTS)
+    assert tiers['forest'] == 0
+
+@pytest.mark.parametrize('serving_model', ['student', 'forest'])
+def test_model_mode_scores_served_model(bundle_dir, trained, monkeypatch, serving_model):
+    forest, student, vectorizer = trained
+    publish_model(forest, vectorizer, {}, student=student, serve_student=True)
+    monkeypatch.setattr(model_module, 'PREDICTION_MODE', 'model')
+    monkeypatch.setattr(model_module, 'SERVING_MODEL', serving_model)
+    model_module._model_cache['entry'] = None
+
+    # A model error would fall back to the keyword rules; fail instead
+    def no_fallback(description, category):
+        raise AssertionError("predict_urgency fell back to the rule-based prediction")
+    monkeypatch.setattr(model_module, 'rule_based_urgency_prediction', no_fallback)
+
+    for description, category in COMPLAINTS:
+        assert predict_urgency(description, category) in ('High', 'Medium', 'Low')
@@ -0,0 +1,78 @@
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_utils import (
+    init_database, add_complaint, update_complaint_status, db_connection, get_training_state,
+    check_complaint_counters, get_status_counts
+)
+
+@pytest.fixture
+def complaints_db(tmp_path, monkeypatch):
+    """A fresh database in a scratch directory with complaints across statuses and urgencies"""
+    monkeypatch.chdir(tmp_path)
+    init_database()
+
+    ids = [
+        add_complaint(1, 'Roads & Potholes', 'Pothole on the main road', '1 Main St', urgency='High'),
+        add_complaint(1, 'Water Supply Issues', 'Low water pressure in the mornings', '2 Lake View', urgency='Low'),
+        add_complaint(2, 'Roads & Potholes', 'Cracked pavement by the bus stop', '3 Park Lane'),
+        add_complaint(2, 'Garbage & Waste Management', 'Bins not collected', '4 Hill Road', urgency='Low')
+    ]
+    assert None not in ids
+    return ids
+
+def counter_groups():
+    """complaint_counters as {(status, urgency, category): count}, without empty groups"""
+    with db_connection() as conn:
+        rows = conn.execute(
+            'SELECT status, urgency, category, complaint_count FROM complaint_counters WHERE complaint_count != 0'
+        ).fetchall()
+    return {row[:3]: row[3] for row in rows}
+
+def actual_groups():
+    """COUNT(*) of complaints per (status, urgency, category)"""
+    with db_connection() as conn:
+        rows = conn.execute(
+            'SELECT status, urgency, category, COUNT(*) FROM complaints GROUP BY status, urgency, category'
+        ).fetchall()
+    return {row[:3]: row[3] for row in rows}
+
+def test_counters_follow_insert_update_delete(complaints_db):
+    assert counter_groups() == actual_groups()
+
+    update_complaint_status(complaints_db[0], 'Resolved', 'AGT001')
+    with db_connection() as conn:
+        conn.execute("UPDATE complaints SET urgency = 'High', category = 'Traffic & Parking' WHERE id = ?", (complaints_db[2],))
+    assert counter_groups() == actual_groups()
+
+    with db_connection() as conn:
+        conn.execute('DELETE FROM complaints WHERE id = ?', (complaints_db[1],))
+    assert counter_groups() == actual_groups()
+
+    assert check_complaint_counters() == []
+    assert get_status_counts() == {'Pending': 2, 'In Progress': 0, 'Resolved': 1}
+    assert get_status_counts(urgency='High') == {'Pending': 1, 'In Progress': 0, 'Resolved': 1}
+
+def test_check_complaint_counters_repairs(complaints_db):
+    with db_connection() as conn:
+        conn.execute("UPDATE complaint_counters SET complaint_count = complaint_count + 5 WHERE urgency = 'Low'")
+
+    mismatches = check_complaint_counters(repair=True)
+    assert sorted((row[3], row[4]) for row in mismatches) == [(6, 1), (6, 1)]
+    assert check_complaint_counters() == []
+    assert counter_groups() == actual_groups()
+
+def test_insert_counter_only_grows(complaints_db):
+    inserted = get_training_state()['complaints_inserted']
+    assert inserted == len(complaints_db)
+
+    add_complaint(3, 'Roads & Potholes', 'Another pothole', '5 Main St')
+    with db_connection() as conn:
+        conn.execute('DELETE FROM complaints WHERE id = ?', (complaints_db[0],))
+
+    # A delete must not hide a new complaint from the retrain check
+    assert get_training_state()['complaints_inserted'] == inserted + 1
@@ -0,0 +1,85 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_utils import (
+    init_database, add_complaint, db_connection, search_complaints, build_export_query,
+    get_complaint_stats, get_dashboard_summary
+)
+
+@pytest.fixture
+def complaints_db(tmp_path, monkeypatch):
+    """Complaints created around day boundaries, some resolved or in progress
+
+    Returns {id: (created_at, updated_at, resolved_at, status)} as stored.
+    """
+    monkeypatch.chdir(tmp_path)
+    init_database()
+
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    timestamps = [
+        # (created, resolved or None, status)
+        (today - timedelta(days=10), today - timedelta(days=9, hours=12), 'Resolved'),
+        (today - timedelta(days=3, hours=-5), None, 'In Progress'),
+        (today - timedelta(seconds=1), None, 'Pending'),
+        (today + timedelta(seconds=30), today + timedelta(seconds=30, hours=2), 'Resolved'),
+        (today - timedelta(days=1, hours=-8), today + timedelta(minutes=1), 'Resolved'),
+        (today - timedelta(days=2), None, 'Pending')
+    ]
+
+    ids = [add_complaint(1, 'Roads & Potholes', f'Pothole number {i}', f'{i} Main St') for i in range(len(timestamps))]
+    assert None not in ids
+
+    stored = {}
+    with db_connection() as conn:
+        for i, (complaint_id, (created, resolved, status)) in enumerate(zip(ids, timestamps)):
+            # Both stored timestamp formats: ISO with a T, and SQLite's space-separated one
+            created_at = created.isoformat() if i % 2 else created.strftime('%Y-%m-%d %H:%M:%S')
+            updated_at = (resolved or created + timedelta(hours=1)).isoformat()
+            resolved_at = resolved.isoformat() if resolved else None
+            conn.execute(
+                'UPDATE complaints SET created_at = ?, updated_at = ?, resolved_at = ?, status = ? WHERE id = ?',
+                (created_at, updated_at, resolved_at, status, complaint_id)
+            )
+            stored[complaint_id] = (created, datetime.fromisoformat(updated_at), resolved, status)
+
+    return stored
+
+def test_date_range_filters(complaints_db):
+    days = sorted({created.date() for created, _, _, _ in complaints_db.values()})
+    for first, last in [(days[0], days[-1]), (days[-2], days[-2]), (days[-1], days[-1]), (days[1], days[-2])]:
+        expected = {complaint_id for complaint_id, (created, _, _, _) in complaints_db.items()
+                    if first <= created.date() <= last}
+        filters = {'date_from': first, 'date_to': last}
+
+        assert {row[0] for row in search_complaints('', filters)} == expected
+        assert {row[0] for row in search_complaints('pothole', filters)} == expected
+
+        query, params = build_export_query(filters)
+        with db_connection() as conn:
+            exported = [row[0] for row in conn.execute(query, params).fetchall()]
+        assert set(exported) == expected
+        assert exported == sorted(exported, key=lambda complaint_id: complaints_db[complaint_id][0], reverse=True)
+
+def test_aggregates_match_stored_timestamps(complaints_db):
+    today = datetime.now().date()
+    rows = complaints_db.values()
+
+    stats = get_complaint_stats()
+    assert stats['submitted_today'] == sum(1 for created, _, _, _ in rows if created.date() == today)
+    assert stats['resolved_today'] == sum(1 for _, _, resolved, _ in rows if resolved and resolved.date() == today)
+
+    resolution_hours = [(resolved - created).total_seconds() / 3600 for created, _, resolved, _ in rows if resolved]
+    assert stats['avg_resolution_time'] == pytest.approx(sum(resolution_hours) / len(resolution_hours))
+
+    summary = get_dashboard_summary()
+    week_ago = datetime.now() - timedelta(days=7)
+    assert summary['recent_complaints'] == sum(1 for created, _, _, _ in rows if created >= week_ago)
+
+    response_hours = [(updated - created).total_seconds() / 3600
+                      for created, updated, _, status in rows if status != 'Pending']
+    assert summary['avg_response_time'] == pytest.approx(sum(response_hours) / len(response_hours))
@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ml.keywords import (
+    build_keyword_matcher, match_keywords, detect_emergency, detect_emergency_batch, FALLBACK_GROUPS
+)
+
+TABLE = {
+    'emergency': ['gas', 'fire', 'leak*'],
+    'water_emergency': ['brown', 'smell*'],
+    'critical': ['urgen*'],
+    'high_urgency': ['urgent', 'fire', 'broken'],
+    'medium_urgency': ['delay*']
+}
+
+@pytest.fixture
+def matcher():
+    return build_keyword_matcher(TABLE)
+
+@pytest.mark.parametrize('text, expected', [
+    ("Gas smell near the school", {'emergency': {'gas'}, 'water_emergency': {'smell*'}}),
+    ("gasoline price board fell over", {}),
+    ("Pipe LEAKING since Monday", {'emergency': {'leak*'}}),
+    ("the faucet keeps leak.", {'emergency': {'leak*'}}),
+    ("bleak weather, nothing urgent", {'critical': {'urgen*'}, 'high_urgency': {'urgent'}}),
+    ("fire-fighters needed: fire!", {'emergency': {'fire'}, 'high_urgency': {'fire'}}),
+    ("", {}),
+    (None, {})
+])
+def test_whole_word_matching(matcher, text, expected):
+    assert match_keywords(text, matcher=matcher) == expected
+
+def test_groups_subset(matcher):
+    text = "urgent: broken main, repairs delayed, gas"
+    assert match_keywords(text, FALLBACK_GROUPS, matcher) == {
+        'critical': {'urgen*'}, 'high_urgency': {'urgent', 'broken'}, 'medium_urgency': {'delay*'}
+    }
+
+def test_category_emergency(matcher):
+    assert detect_emergency("brown water from the tap", 'Water Supply Issues', matcher)
+    assert not detect_emergency("brown water from the tap", 'Roads & Potholes', matcher)
+    assert not detect_emergency("brownish stain on the wall", 'Water Supply Issues', matcher)
+    assert detect_emergency("gas leak", 'Roads & Potholes', matcher)
+
+def test_batch_matches_single_rows(matcher):
+    texts = ["brown water", "gas leak", "gasoline", None, "Fire!", "smelly drain", "delayed bus"]
+    categories = ['Water Supply Issues', 'Other', 'Other', 'Other', 'Other', 'Water Supply Issues', 'Other']
+    assert list(detect_emergency_batch(texts, categories, matcher)) == [
+        detect_emergency(text, category, matcher) for text, category in zip(texts, categories)
+    ]
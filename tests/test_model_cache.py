@@ -0,0 +1,58 @@
+import os
+import sys
+import threading
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ml.model as model_module
+from ml.model import (
+    get_initial_training_data, build_vectorizer, build_forest, publish_model, get_cached_model,
+    get_model_cache_stats
+)
+from ml.model_bundle import publish_bundle, read_manifest
+
+@pytest.fixture
+def published(tmp_path, monkeypatch):
+    """Publish a small forest into a scratch directory and reset the cache counters"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(model_module, 'SERVING_MODEL', 'forest')
+    monkeypatch.setitem(model_module._model_cache, 'entry', None)
+    monkeypatch.setitem(model_module._model_cache, 'checked', None)
+    monkeypatch.setitem(model_module._model_cache, 'hits', 0)
+
+    data = get_initial_training_data()
+    vectorizer = build_vectorizer()
+    forest = build_forest()
+    forest.fit(vectorizer.fit_transform(data['combined_features']), data['urgency'])
+    version = publish_model(forest, vectorizer, {})
+    return forest, vectorizer, version
+
+def test_hits_counted_across_threads(published):
+    get_cached_model()
+    hits = get_model_cache_stats()['hits']
+
+    def lookups():
+        for _ in range(500):
+            get_cached_model()
+
+    threads = [threading.Thread(target=lookups) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert get_model_cache_stats()['hits'] == hits + 8 * 500
+
+def test_bundle_published_elsewhere_is_reloaded(published):
+    forest, vectorizer, version = published
+    get_cached_model()
+    assert get_model_cache_stats()['signature'] == version
+
+    # Another process publishes: only CURRENT changes on disk
+    new_version = publish_bundle({'model': forest, 'vectorizer': vectorizer}, read_manifest(version))
+
+    get_cached_model()
+    stats = get_model_cache_stats()
+    assert stats['signature'] == new_version != version
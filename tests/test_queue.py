@@ -0,0 +1,79 @@
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_utils import (
+    init_database, add_complaint, update_complaint_status, db_connection, get_all_complaints,
+    get_complaint_queue, get_all_complaints_page, get_user_complaints_page, OPEN_STATUS
+)
+
+CATEGORIES = ['Roads & Potholes', 'Water Supply Issues', 'Garbage & Waste Management']
+URGENCIES = ['High', 'Medium', 'Low']
+
+@pytest.fixture
+def complaints_db(tmp_path, monkeypatch):
+    """30 complaints over a few shared timestamps, so the id breaks ties in the queue order"""
+    monkeypatch.chdir(tmp_path)
+    init_database()
+
+    for i in range(30):
+        complaint_id = add_complaint(i % 4, CATEGORIES[i % 3], f'Complaint number {i} about item {i * 7}',
+                                     f'{i} Main St', urgency=URGENCIES[i % 5 % 3])
+        assert complaint_id is not None
+        if i % 4 == 0:
+            update_complaint_status(complaint_id, 'Resolved', 'AGT001')
+
+    with db_connection() as conn:
+        conn.execute("UPDATE complaints SET created_at = '2026-10-0' || (id % 3 + 1) || ' 09:00:00'")
+
+def read_pages(page_size, **filters):
+    """Every row of a queue, read page by page through next_cursor"""
+    rows, cursor = [], None
+    while True:
+        queue = get_complaint_queue(after=cursor, page_size=page_size, include_counts=False, **filters)
+        rows += queue['complaints']
+        cursor = queue['next_cursor']
+        if cursor is None:
+            return rows
+
+def test_pages_concatenate_to_full_order(complaints_db):
+    all_complaints = get_all_complaints()
+    assert len(all_complaints) == 30
+
+    for page_size in (1, 4, 7, 30, 100):
+        assert read_pages(page_size) == all_complaints
+
+    page, cursor = get_all_complaints_page(page_size=10)
+    assert page == all_complaints[:10]
+    page, cursor = get_all_complaints_page(after=cursor, page_size=10)
+    assert page == all_complaints[10:20]
+
+@pytest.mark.parametrize('filters', [
+    {'status': 'Resolved'},
+    {'status': OPEN_STATUS},
+    {'urgency': 'Medium'},
+    {'category': 'Water Supply Issues', 'urgency': 'High'},
+    {'status': 'Pending', 'category': 'Roads & Potholes'}
+])
+def test_filtered_pages_match_filtered_order(complaints_db, filters):
+    def keep(row):
+        status_ok = (row[8] != 'Resolved' if filters.get('status') == OPEN_STATUS
+                     else filters.get('status') in (None, row[8]))
+        return status_ok and filters.get('urgency') in (None, row[7]) and filters.get('category') in (None, row[2])
+
+    expected = [row for row in get_all_complaints() if keep(row)]
+    assert expected
+    assert read_pages(3, **filters) == expected
+
+def test_newest_order_and_user_pages(complaints_db):
+    newest = sorted(get_all_complaints(), key=lambda row: (row[9], row[0]), reverse=True)
+    assert read_pages(4, order='newest') == newest
+
+    user_rows = [row for row in get_all_complaints() if row[1] == 2]
+    page, cursor = get_user_complaints_page(2, page_size=5)
+    rest, cursor = get_user_complaints_page(2, after=cursor, page_size=5)
+    assert cursor is None
+    assert page + rest == user_rows
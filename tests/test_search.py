@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils.data_utils as data_utils
+from utils.data_utils import init_database, add_complaint, search_complaints, SEARCH_COLUMNS
+
+@pytest.fixture
+def complaints_db(tmp_path, monkeypatch):
+    """A fresh database in a scratch directory with a few complaints"""
+    monkeypatch.chdir(tmp_path)
+    init_database()
+
+    ids = [
+        add_complaint(1, 'Roads & Potholes', 'Deep pothole on the main street near the market', '12 Market Road'),
+        add_complaint(1, 'Water Supply Issues', 'Water pipe burst flooding the street', '4 Lake View'),
+        add_complaint(2, 'Garbage & Waste Management', 'Garbage bins overflowing for a week', '9 Park Lane')
+    ]
+    assert None not in ids
+    return ids
+
+def check_rows(rows, expected_ids):
+    """Rows carry exactly the SEARCH_COLUMNS, for the expected complaints"""
+    assert sorted(row[0] for row in rows) == sorted(expected_ids)
+    for row in rows:
+        assert len(row) == len(SEARCH_COLUMNS)
+        assert row[SEARCH_COLUMNS.index('description')]
+
+def test_fts_search_returns_search_columns(complaints_db):
+    rows = search_complaints('stree')
+    check_rows(rows, complaints_db[:2])
+
+    result = search_complaints('pothole', include_snippets=True)
+    check_rows(result['complaints'], complaints_db[:1])
+    assert '**' in result['snippets'][complaints_db[0]]
+
+def test_like_fallback_returns_same_shape(complaints_db, monkeypatch):
+    # Without the FTS5 table the LIKE scan answers
+    monkeypatch.setattr(data_utils, 'table_exists', lambda cursor, table: False)
+
+    rows = search_complaints('street')
+    check_rows(rows, complaints_db[:2])
+
+    result = search_complaints('pothole', include_snippets=True)
+    check_rows(result['complaints'], complaints_db[:1])
+    assert result['snippets'] == {complaints_db[0]: 'Deep pothole on the main street near the market'}
+
+def test_empty_term_lists_newest_first(complaints_db):
+    rows = search_complaints('', {'category': 'Garbage & Waste Management'})
+    check_rows(rows, complaints_db[2:])
+    assert [row[0] for row in search_complaints('')] == sorted(complaints_db, reverse=True)
@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_utils import init_database, add_complaint, db_connection
+from ml.model import get_training_window, create_features
+
+@pytest.fixture
+def complaints_db(tmp_path, monkeypatch):
+    """A fresh database in a scratch directory"""
+    monkeypatch.chdir(tmp_path)
+    init_database()
+
+def test_window_deduplicates_across_chunks(complaints_db):
+    texts = ['street light broken at night', 'garbage not collected this week', 'street light broken at night',
+             'water pipe leaking', 'garbage not collected this week']
+    for text in texts:
+        add_complaint(1, 'Other Municipal Issues', text, '1 Main St')
+
+    # A complaint stored without feature text has it rebuilt from description and category
+    with db_connection() as conn:
+        conn.execute("UPDATE complaints SET combined_features = NULL WHERE description = 'water pipe leaking'")
+        conn.commit()
+
+    # Each text keeps its newest complaint; the window is returned oldest first
+    window, stats = get_training_window(max_rows=0, max_days=0, chunk_size=2)
+
+    assert list(window.columns) == ['combined_features', 'urgency']
+    assert list(window['combined_features']) == [
+        create_features(text, 'Other Municipal Issues')
+        for text in ['street light broken at night', 'water pipe leaking', 'garbage not collected this week']
+    ]
+    assert stats['rows_read'] == 5
+    assert stats['duplicates_dropped'] == 2
+    assert stats['rows_used'] == 3
@@ -0,0 +1,33 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ml.model import get_initial_training_data, build_vectorizer, build_forest
+from ml.tree_engine import flatten_forest, predict_proba_flat, PREDICT_CHUNK_SIZE
+
+@pytest.fixture(scope='module')
+def forest_and_features():
+    """A forest fitted on the synthetic data, and a sparse matrix spanning several predict chunks"""
+    data = get_initial_training_data()
+    vectorizer = build_vectorizer()
+    X = vectorizer.fit_transform(data['combined_features'])
+    forest = build_forest()
+    forest.fit(X, data['urgency'])
+
+    repeats = PREDICT_CHUNK_SIZE // X.shape[0] + 2
+    texts = list(data['combined_features']) * repeats + ['unseen words only', '']
+    return forest, vectorizer.transform(texts)
+
+def test_flat_forest_matches_sklearn(forest_and_features):
+    forest, X = forest_and_features
+    assert np.array_equal(forest.predict_proba(X), predict_proba_flat(flatten_forest(forest), X))
+
+def test_flat_forest_single_rows(forest_and_features):
+    forest, X = forest_and_features
+    flat_forest = flatten_forest(forest)
+    for i in range(0, X.shape[0], 37):
+        assert np.array_equal(forest.predict_proba(X[i]), predict_proba_flat(flat_forest, X[i]))
@@ -4,31 +4,28 @@
 __version__ = "1.0.0"
 __author__ = "CitiZen AI Development Team"
 
-# Import main utility functions for easy access
-from .data_utils import (
-    init_database,
-    get_db_connection,
-    add_complaint,
-    get_all_complaints,
-    get_user_complaints,
-    update_complaint_status,
-    get_complaint_stats,
-    search_complaints,
-    export_complaints_to_csv,
-    backup_database,
-    cleanup_old_images
-)
-
+# Main utility functions are imported from .data_utils on first access (see __getattr__)
 __all__ = [
     'init_database',
     'get_db_connection',
+    'db_connection',
     'add_complaint',
     'get_all_complaints',
+    'get_complaint_queue',
     'get_user_complaints', 
     'update_complaint_status',
     'get_complaint_stats',
+    'get_status_counts',
+    'check_complaint_counters',
     'search_complaints',
     'export_complaints_to_csv',
     'backup_database',
     'cleanup_old_images'
-]
\ No newline at end of file
+]
+
+def __getattr__(name):
+    """Import a utility function from .data_utils on first access"""
+    if name in __all__:
+        from importlib import import_module
+        return getattr(import_module('.data_utils', __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
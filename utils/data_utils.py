@@ -1,156 +1,846 @@
 import sqlite3
-import pandas as pd
 import os
+import re
+import calendar
 from datetime import datetime, timedelta
 import hashlib
+import sys
+import threading
+from contextlib import contextmanager
+from queue import LifoQueue, Empty, Full
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.text_utils import create_features
+from utils.near_duplicates import (
+    create_duplicate_index_tables, minhash_signature, find_duplicate, index_complaint,
+    rebuild_duplicate_index
+)
 
 # Database path
 DATABASE_PATH = "db/complaints.db"
 
+# Queue order: urgency rank, then oldest first. The rank is stored in
+# complaints.urgency_rank, which triggers compute with this expression.
+URGENCY_RANK_SQL = "CASE urgency WHEN 'High' THEN 1 WHEN 'Medium' THEN 2 WHEN 'Low' THEN 3 ELSE 4 END"
+
+# Rank of each urgency in URGENCY_RANK_SQL
+URGENCY_RANKS = {'High': 1, 'Medium': 2, 'Low': 3}
+
+# Status filter for every complaint not yet resolved. It is filtered with
+# this literal condition, which the partial open-queue index is built on.
+OPEN_STATUS = 'Open'
+OPEN_STATUS_SQL = "status != 'Resolved'"
+
+# Complaints per page of the paginated queries
+QUEUE_PAGE_SIZE = 50
+
+# Queue orderings: name -> (sort keys, descending). The queue-order
+# indexes cover 'priority' under every filter combination.
+QUEUE_ORDERS = {
+    'priority': (['urgency_rank', 'created_at', 'id'], False),
+    'oldest': (['created_at', 'id'], False),
+    'newest': (['created_at', 'id'], True),
+}
+
+# Complaint categories offered by the submission form and the queue filters
+COMPLAINT_CATEGORIES = [
+    "Garbage & Waste Management",
+    "Drainage & Water Logging",
+    "Streetlight & Electricity",
+    "Roads & Potholes",
+    "Water Supply Issues",
+    "Public Safety & Security",
+    "Noise Pollution",
+    "Tree Fall & Maintenance",
+    "Traffic & Parking",
+    "Other Municipal Issues"
+]
+
+COMPLAINT_STATUSES = ['Pending', 'In Progress', 'Resolved']
+
+# BM25 weights of the description, address, landmark and category columns in search ranking
+SEARCH_COLUMN_WEIGHTS = (1.0, 0.5, 0.5, 2.0)
+
+# Integer copy of each complaint timestamp: seconds since 1970-01-01 of the
+# stored local time, as strftime('%s') reads it. Date filters and durations
+# use these columns so they can be answered from indexes.
+EPOCH_COLUMNS = {'created_at': 'created_epoch', 'updated_at': 'updated_epoch', 'resolved_at': 'resolved_epoch'}
+
+# Idle connections kept per process; extra connections opened under load are closed on return
+DB_POOL_SIZE = int(os.environ.get("CITIZEN_AI_DB_POOL_SIZE", "8"))
+
+# How long a connection waits for a lock held by another writer
+DB_BUSY_TIMEOUT_MS = int(os.environ.get("CITIZEN_AI_DB_BUSY_TIMEOUT_MS", "5000"))
+
+# Page cache per connection and memory-mapped I/O window
+DB_CACHE_SIZE_KB = int(os.environ.get("CITIZEN_AI_DB_CACHE_SIZE_KB", "16384"))
+DB_MMAP_SIZE_MB = int(os.environ.get("CITIZEN_AI_DB_MMAP_SIZE_MB", "256"))
+
+_pool_lock = threading.Lock()
+_connection_pools = {}
+_pool_stats = {'opened': 0, 'reused': 0, 'closed': 0}
+
 def ensure_db_directory():
     """Ensure the db directory exists"""
     os.makedirs("db", exist_ok=True)
 
+def configure_connection(conn):
+    """Apply the connection pragmas once, when a connection is opened
+    
+    WAL lets readers run while a complaint is being written;
+    synchronous=NORMAL is durable across application crashes in WAL mode.
+    """
+    conn.execute(f'PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS}')
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute(f'PRAGMA cache_size = -{DB_CACHE_SIZE_KB}')
+    conn.execute(f'PRAGMA mmap_size = {DB_MMAP_SIZE_MB * 1024 * 1024}')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    return conn
+
 def get_db_connection():
-    """Get database connection"""
+    """Open a new configured database connection that the caller closes
+    
+    Prefer db_connection(), which reuses pooled connections.
+    """
     ensure_db_directory()
-    return sqlite3.connect(DATABASE_PATH)
+    conn = sqlite3.connect(DATABASE_PATH, timeout=DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+    return configure_connection(conn)
+
+def _get_connection_pool():
+    """Idle connection pool for this process and database file"""
+    # Connections must not cross a fork, and tests may point DATABASE_PATH elsewhere
+    key = (os.getpid(), os.path.abspath(DATABASE_PATH))
+    with _pool_lock:
+        pool = _connection_pools.get(key)
+        if pool is None:
+            pool = _connection_pools[key] = LifoQueue(maxsize=DB_POOL_SIZE)
+        return pool
+
+@contextmanager
+def db_connection():
+    """Borrow a pooled database connection
+    
+    Commits when the block completes and rolls back if it raises, so a
+    connection always goes back to the pool outside a transaction. Callers
+    must not close the connection.
+    """
+    pool = _get_connection_pool()
+    try:
+        conn = pool.get_nowait()
+        reused = True
+    except Empty:
+        conn = get_db_connection()
+        reused = False
+    
+    with _pool_lock:
+        _pool_stats['reused' if reused else 'opened'] += 1
+    
+    healthy = True
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        try:
+            conn.rollback()
+        except sqlite3.Error:
+            healthy = False
+        raise
+    finally:
+        returned = False
+        if healthy:
+            try:
+                pool.put_nowait(conn)
+                returned = True
+            except Full:
+                pass
+        
+        if not returned:
+            conn.close()
+            with _pool_lock:
+                _pool_stats['closed'] += 1
+
+def close_db_connections():
+    """Close every idle pooled connection of this process"""
+    with _pool_lock:
+        pools = [pool for (pid, _), pool in _connection_pools.items() if pid == os.getpid()]
+    
+    closed = 0
+    for pool in pools:
+        while True:
+            try:
+                pool.get_nowait().close()
+                closed += 1
+            except Empty:
+                break
+    
+    return closed
+
+def get_connection_pool_stats():
+    """Connections opened, reused from the pool and closed in this process"""
+    with _pool_lock:
+        stats = dict(_pool_stats)
+    stats['idle'] = _get_connection_pool().qsize()
+    return stats
 
 def init_database():
     """Initialize the SQLite database and create all necessary tables"""
     ensure_db_directory()
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        
+        # Create users table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                email TEXT UNIQUE NOT NULL,
+                password TEXT NOT NULL,
+                created_at DATETIME NOT NULL,
+                last_login DATETIME,
+                status TEXT DEFAULT 'active'
+            )
+        ''')
+        
+        # Create agents table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS agents (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                agent_id TEXT UNIQUE NOT NULL,
+                password TEXT NOT NULL,
+                created_at DATETIME NOT NULL,
+                last_login DATETIME,
+                status TEXT DEFAULT 'active',
+                department TEXT,
+                total_resolved INTEGER DEFAULT 0
+            )
+        ''')
+        
+        # Create complaints table with comprehensive fields
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS complaints (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                category TEXT NOT NULL,
+                description TEXT NOT NULL,
+                address TEXT NOT NULL,
+                landmark TEXT,
+                image_path TEXT,
+                urgency TEXT NOT NULL,
+                user_priority TEXT,
+                status TEXT NOT NULL DEFAULT 'Pending',
+                assigned_agent TEXT,
+                resolution_notes TEXT,
+                created_at DATETIME NOT NULL,
+                updated_at DATETIME,
+                resolved_at DATETIME,
+                estimated_resolution_time TEXT,
+                FOREIGN KEY (user_id) REFERENCES users (id),
+                FOREIGN KEY (assigned_agent) REFERENCES agents (agent_id)
+            )
+        ''')
+        
+        # Create complaint_history table for tracking status changes
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS complaint_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                complaint_id INTEGER NOT NULL,
+                old_status TEXT,
+                new_status TEXT,
+                changed_by TEXT,
+                change_reason TEXT,
+                changed_at DATETIME NOT NULL,
+                FOREIGN KEY (complaint_id) REFERENCES complaints (id)
+            )
+        ''')
+        
+        # Create feedback table for citizen feedback on resolutions
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS feedback (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                complaint_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                rating INTEGER CHECK (rating >= 1 AND rating <= 5),
+                comments TEXT,
+                created_at DATETIME NOT NULL,
+                FOREIGN KEY (complaint_id) REFERENCES complaints (id),
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
+        
+        # Create indexes for better performance
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_status ON complaints(status)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_urgency ON complaints(urgency)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_category ON complaints(category)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_created_at ON complaints(created_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_user_id ON complaints(user_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_assigned_agent ON complaints(assigned_agent)')
+        
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_agents_agent_id ON agents(agent_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaint_history_complaint_id ON complaint_history(complaint_id)')
+        
+        # Bring older databases up to the current schema
+        apply_migrations(cursor)
+    
+    print("✅ Database initialized successfully with all tables and indexes!")
+
+def column_exists(cursor, table, column):
+    """Check whether a table already has a column"""
+    cursor.execute(f'PRAGMA table_info({table})')
+    return any(row[1] == column for row in cursor.fetchall())
+
+def table_exists(cursor, table):
+    """Check whether a table (or virtual table) exists"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+    return cursor.fetchone() is not None
+
+def epoch_sql(column):
+    """SQL for the epoch seconds of a timestamp column, as stored in the *_epoch columns"""
+    return f"CAST(strftime('%s', {column}) AS INTEGER)"
+
+def epoch_assignments_sql():
+    """SET clause that recomputes every *_epoch column from its timestamp"""
+    return ', '.join(f'{epoch_column} = {epoch_sql(column)}' for column, epoch_column in EPOCH_COLUMNS.items())
+
+def to_epoch(value):
+    """Epoch seconds of a datetime, date or ISO string, matching the *_epoch columns
     
-    # Create users table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            created_at DATETIME NOT NULL,
-            last_login DATETIME,
-            status TEXT DEFAULT 'active'
+    Naive timestamps are read as they are stored, without a timezone
+    conversion, so a date maps to the start of that day in stored time.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return calendar.timegm(value.timetuple())
+
+def backfill_combined_features(cursor, batch_size=1000):
+    """Compute stored model feature text for complaints that do not have it yet"""
+    total = 0
+    last_id = 0
+    
+    while True:
+        cursor.execute('''
+            SELECT id, description, category FROM complaints
+            WHERE combined_features IS NULL AND id > ?
+            ORDER BY id
+            LIMIT ?
+        ''', (last_id, batch_size))
+        rows = cursor.fetchall()
+        
+        if not rows:
+            break
+        
+        cursor.executemany(
+            'UPDATE complaints SET combined_features = ? WHERE id = ?',
+            [(create_features(description, category), complaint_id) for complaint_id, description, category in rows]
         )
+        total += len(rows)
+        last_id = rows[-1][0]
+    
+    return total
+
+def _migrate_add_combined_features(cursor):
+    """Store the normalized model feature text alongside each complaint"""
+    if not column_exists(cursor, 'complaints', 'combined_features'):
+        cursor.execute('ALTER TABLE complaints ADD COLUMN combined_features TEXT')
+    
+    backfilled = backfill_combined_features(cursor)
+    if backfilled:
+        print(f"✅ Backfilled feature text for {backfilled} complaints")
+
+def _migrate_add_duplicate_index(cursor):
+    """Add duplicate links and the near-duplicate index, then index existing complaints"""
+    if not column_exists(cursor, 'complaints', 'duplicate_of'):
+        cursor.execute('ALTER TABLE complaints ADD COLUMN duplicate_of INTEGER REFERENCES complaints (id)')
+    
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_complaints_duplicate_of
+        ON complaints(duplicate_of) WHERE duplicate_of IS NOT NULL
     ''')
+    create_duplicate_index_tables(cursor)
     
-    # Create agents table
+    indexed, linked = rebuild_duplicate_index(cursor)
+    if indexed:
+        print(f"✅ Indexed {indexed} complaints for near-duplicate detection ({linked} linked)")
+
+def _migrate_add_training_state(cursor):
+    """Add the single-row training_state table and the trigger that counts complaint inserts"""
     cursor.execute('''
-        CREATE TABLE IF NOT EXISTS agents (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            agent_id TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            created_at DATETIME NOT NULL,
-            last_login DATETIME,
-            status TEXT DEFAULT 'active',
-            department TEXT,
-            total_resolved INTEGER DEFAULT 0
+        CREATE TABLE IF NOT EXISTS training_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            complaints_inserted INTEGER NOT NULL DEFAULT 0,
+            inserted_at_last_train INTEGER,
+            model_version TEXT,
+            training_type TEXT,
+            last_trained_at DATETIME,
+            updated_at DATETIME
         )
     ''')
     
-    # Create complaints table with comprehensive fields
+    # The counter only ever grows, so deleting complaints cannot hide new ones
     cursor.execute('''
-        CREATE TABLE IF NOT EXISTS complaints (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            category TEXT NOT NULL,
-            description TEXT NOT NULL,
-            address TEXT NOT NULL,
-            landmark TEXT,
-            image_path TEXT,
+        INSERT OR IGNORE INTO training_state (id, complaints_inserted, updated_at)
+        SELECT 1, COUNT(*), ? FROM complaints
+    ''', (datetime.now().isoformat(),))
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_complaints_count_inserts
+        AFTER INSERT ON complaints
+        BEGIN
+            UPDATE training_state SET complaints_inserted = complaints_inserted + 1 WHERE id = 1;
+        END
+    ''')
+
+def _migrate_add_queue_order_indexes(cursor):
+    """Index the queue order (urgency rank, created_at, id) for keyset pagination"""
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_complaints_queue_order
+        ON complaints(({URGENCY_RANK_SQL}), created_at, id)
+    ''')
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_complaints_status_queue_order
+        ON complaints(status, ({URGENCY_RANK_SQL}), created_at, id)
+    ''')
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_complaints_user_queue_order
+        ON complaints(user_id, ({URGENCY_RANK_SQL}), created_at, id)
+    ''')
+
+def _migrate_add_category_queue_order_indexes(cursor):
+    """Index the queue order under category filters, alone and combined with status"""
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_complaints_category_queue_order
+        ON complaints(category, ({URGENCY_RANK_SQL}), created_at, id)
+    ''')
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_complaints_status_category_queue_order
+        ON complaints(status, category, ({URGENCY_RANK_SQL}), created_at, id)
+    ''')
+
+def _migrate_add_complaint_counters(cursor):
+    """Add complaint_counters with the triggers that keep it current, and count existing complaints"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS complaint_counters (
+            status TEXT NOT NULL,
             urgency TEXT NOT NULL,
-            user_priority TEXT,
-            status TEXT NOT NULL DEFAULT 'Pending',
-            assigned_agent TEXT,
-            resolution_notes TEXT,
-            created_at DATETIME NOT NULL,
-            updated_at DATETIME,
-            resolved_at DATETIME,
-            estimated_resolution_time TEXT,
-            FOREIGN KEY (user_id) REFERENCES users (id),
-            FOREIGN KEY (assigned_agent) REFERENCES agents (agent_id)
-        )
+            category TEXT NOT NULL,
+            complaint_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (status, urgency, category)
+        ) WITHOUT ROWID
     ''')
     
-    # Create complaint_history table for tracking status changes
+    # Every insert, delete or change of status, urgency or category moves
+    # one complaint between (status, urgency, category) groups
     cursor.execute('''
-        CREATE TABLE IF NOT EXISTS complaint_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            complaint_id INTEGER NOT NULL,
-            old_status TEXT,
-            new_status TEXT,
-            changed_by TEXT,
-            change_reason TEXT,
-            changed_at DATETIME NOT NULL,
-            FOREIGN KEY (complaint_id) REFERENCES complaints (id)
-        )
+        CREATE TRIGGER IF NOT EXISTS trg_complaints_counters_insert
+        AFTER INSERT ON complaints
+        BEGIN
+            INSERT INTO complaint_counters (status, urgency, category, complaint_count)
+            VALUES (NEW.status, NEW.urgency, NEW.category, 1)
+            ON CONFLICT (status, urgency, category) DO UPDATE SET complaint_count = complaint_count + 1;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_complaints_counters_delete
+        AFTER DELETE ON complaints
+        BEGIN
+            UPDATE complaint_counters SET complaint_count = complaint_count - 1
+            WHERE status = OLD.status AND urgency = OLD.urgency AND category = OLD.category;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_complaints_counters_update
+        AFTER UPDATE OF status, urgency, category ON complaints
+        WHEN OLD.status IS NOT NEW.status OR OLD.urgency IS NOT NEW.urgency OR OLD.category IS NOT NEW.category
+        BEGIN
+            UPDATE complaint_counters SET complaint_count = complaint_count - 1
+            WHERE status = OLD.status AND urgency = OLD.urgency AND category = OLD.category;
+            INSERT INTO complaint_counters (status, urgency, category, complaint_count)
+            VALUES (NEW.status, NEW.urgency, NEW.category, 1)
+            ON CONFLICT (status, urgency, category) DO UPDATE SET complaint_count = complaint_count + 1;
+        END
+    ''')
+    
+    # Agent workload is counted from this index alone
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_agent_status ON complaints(assigned_agent, status)')
+    
+    counted = rebuild_complaint_counters(cursor)
+    if counted:
+        print(f"✅ Counted {counted} complaints into complaint_counters")
+
+def _migrate_add_search_index(cursor):
+    """Add the complaints_fts full-text index with its sync triggers, and index existing complaints
+    
+    complaints_fts is an external-content FTS5 table: it stores only the
+    index and reads column values from complaints. SQLite builds without
+    FTS5 skip it and search falls back to LIKE.
+    """
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS complaints_fts USING fts5(
+                description, address, landmark, category,
+                content='complaints', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"⚠️ Full-text search index not created, search will use LIKE: {e}")
+        return
+    
+    # External-content tables are updated by deleting the old values and inserting the new ones
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_complaints_fts_insert
+        AFTER INSERT ON complaints
+        BEGIN
+            INSERT INTO complaints_fts (rowid, description, address, landmark, category)
+            VALUES (NEW.id, NEW.description, NEW.address, NEW.landmark, NEW.category);
+        END
     ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_complaints_fts_delete
+        AFTER DELETE ON complaints
+        BEGIN
+            INSERT INTO complaints_fts (complaints_fts, rowid, description, address, landmark, category)
+            VALUES ('delete', OLD.id, OLD.description, OLD.address, OLD.landmark, OLD.category);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_complaints_fts_update
+        AFTER UPDATE OF description, address, landmark, category ON complaints
+        BEGIN
+            INSERT INTO complaints_fts (complaints_fts, rowid, description, address, landmark, category)
+            VALUES ('delete', OLD.id, OLD.description, OLD.address, OLD.landmark, OLD.category);
+            INSERT INTO complaints_fts (rowid, description, address, landmark, category)
+            VALUES (NEW.id, NEW.description, NEW.address, NEW.landmark, NEW.category);
+        END
+    ''')
+    
+    cursor.execute("INSERT INTO complaints_fts (complaints_fts) VALUES ('rebuild')")
+
+def _migrate_add_epoch_timestamps(cursor):
+    """Add indexed epoch copies of the complaint timestamps with the triggers that keep them current, and fill them in
     
-    # Create feedback table for citizen feedback on resolutions
+    Filters such as DATE(created_at) = ? or JULIANDAY arithmetic wrap the
+    column in a function, so no index can answer them; ranges and
+    differences over the integer columns can.
+    """
+    for epoch_column in EPOCH_COLUMNS.values():
+        if not column_exists(cursor, 'complaints', epoch_column):
+            cursor.execute(f'ALTER TABLE complaints ADD COLUMN {epoch_column} INTEGER')
+    
+    # The triggers only write the epoch columns, so they do not fire each other
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_complaints_epoch_insert
+        AFTER INSERT ON complaints
+        BEGIN
+            UPDATE complaints SET {epoch_assignments_sql()} WHERE id = NEW.id;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_complaints_epoch_update
+        AFTER UPDATE OF {', '.join(EPOCH_COLUMNS)} ON complaints
+        BEGIN
+            UPDATE complaints SET {epoch_assignments_sql()} WHERE id = NEW.id;
+        END
+    ''')
+    
+    cursor.execute(f'UPDATE complaints SET {epoch_assignments_sql()}')
+    if cursor.rowcount > 0:
+        print(f"✅ Backfilled epoch timestamps for {cursor.rowcount} complaints")
+    
+    # Day and week counts seek created_epoch or resolved_epoch; the averages
+    # read both ends of each duration from the index without the table
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_created_epoch ON complaints(created_epoch)')
     cursor.execute('''
-        CREATE TABLE IF NOT EXISTS feedback (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            complaint_id INTEGER NOT NULL,
-            user_id INTEGER NOT NULL,
-            rating INTEGER CHECK (rating >= 1 AND rating <= 5),
-            comments TEXT,
-            created_at DATETIME NOT NULL,
-            FOREIGN KEY (complaint_id) REFERENCES complaints (id),
-            FOREIGN KEY (user_id) REFERENCES users (id)
-        )
+        CREATE INDEX IF NOT EXISTS idx_complaints_resolved_epoch
+        ON complaints(resolved_epoch, created_epoch, status) WHERE resolved_epoch IS NOT NULL
     ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_complaints_status_updated_epoch
+        ON complaints(status, updated_epoch, created_epoch)
+    ''')
+
+def _migrate_add_urgency_rank(cursor):
+    """Store the urgency rank in a column and rebuild the queue-order indexes on it
     
-    # Create indexes for better performance
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_status ON complaints(status)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_urgency ON complaints(urgency)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_category ON complaints(category)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_created_at ON complaints(created_at)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_user_id ON complaints(user_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_assigned_agent ON complaints(assigned_agent)')
+    SQLite cannot seek an expression index with a row-value comparison, and
+    queries without the exact rank expression sort every row. A plain
+    column has neither problem. The partial open-queue index serves the
+    Open status filter, which a status-prefixed index could only answer
+    with a sort.
+    """
+    if not column_exists(cursor, 'complaints', 'urgency_rank'):
+        cursor.execute('ALTER TABLE complaints ADD COLUMN urgency_rank INTEGER')
     
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_agents_agent_id ON agents(agent_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaint_history_complaint_id ON complaint_history(complaint_id)')
+    # One insert trigger fills every derived column, so a new complaint is rewritten once
+    cursor.execute('DROP TRIGGER IF EXISTS trg_complaints_epoch_insert')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_complaints_derived_insert
+        AFTER INSERT ON complaints
+        BEGIN
+            UPDATE complaints SET urgency_rank = {URGENCY_RANK_SQL}, {epoch_assignments_sql()} WHERE id = NEW.id;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_complaints_rank_update
+        AFTER UPDATE OF urgency ON complaints
+        BEGIN
+            UPDATE complaints SET urgency_rank = {URGENCY_RANK_SQL} WHERE id = NEW.id;
+        END
+    ''')
     
-    conn.commit()
-    conn.close()
+    cursor.execute(f'UPDATE complaints SET urgency_rank = {URGENCY_RANK_SQL}')
+    if cursor.rowcount > 0:
+        print(f"✅ Stored urgency ranks for {cursor.rowcount} complaints")
     
-    print("✅ Database initialized successfully with all tables and indexes!")
+    # Same names and orders as the expression indexes they replace
+    for name, prefix in [('idx_complaints_queue_order', ''), ('idx_complaints_status_queue_order', 'status, '),
+                         ('idx_complaints_user_queue_order', 'user_id, '),
+                         ('idx_complaints_category_queue_order', 'category, '),
+                         ('idx_complaints_status_category_queue_order', 'status, category, ')]:
+        cursor.execute(f'DROP INDEX IF EXISTS {name}')
+        cursor.execute(f'CREATE INDEX {name} ON complaints({prefix}urgency_rank, created_at, id)')
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_complaints_open_queue_order
+        ON complaints(urgency_rank, created_at, id) WHERE {OPEN_STATUS_SQL}
+    ''')
 
-def add_complaint(user_id, category, description, address, landmark=None, image_path=None, urgency='Medium', user_priority='Medium'):
-    """Add a new complaint to the database"""
+def _migrate_add_duplicate_index_cleanup(cursor):
+    """Drop a deleted complaint's signature, LSH buckets and duplicate links, and purge existing orphans"""
+    # The bucket table is keyed by (band, bucket); deletes find a complaint's rows through this index
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaint_lsh_buckets_complaint ON complaint_lsh_buckets(complaint_id)')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_complaints_duplicate_index_delete
+        AFTER DELETE ON complaints
+        BEGIN
+            DELETE FROM complaint_minhash WHERE complaint_id = OLD.id;
+            DELETE FROM complaint_lsh_buckets WHERE complaint_id = OLD.id;
+            UPDATE complaints SET duplicate_of = NULL WHERE duplicate_of = OLD.id;
+        END
+    ''')
+    
+    cursor.execute('DELETE FROM complaint_minhash WHERE complaint_id NOT IN (SELECT id FROM complaints)')
+    orphans = cursor.rowcount
+    cursor.execute('DELETE FROM complaint_lsh_buckets WHERE complaint_id NOT IN (SELECT id FROM complaints)')
+    cursor.execute('''
+        UPDATE complaints SET duplicate_of = NULL
+        WHERE duplicate_of IS NOT NULL AND duplicate_of NOT IN (SELECT id FROM complaints)
+    ''')
+    if orphans > 0:
+        print(f"✅ Removed near-duplicate index entries of {orphans} deleted complaints")
+
+# Schema version whose migration builds the near-duplicate index from every complaint
+DUPLICATE_INDEX_SCHEMA_VERSION = 2
+
+# Schema migrations as (version, function); applied once, tracked in PRAGMA user_version
+SCHEMA_MIGRATIONS = [
+    (1, _migrate_add_combined_features),
+    (DUPLICATE_INDEX_SCHEMA_VERSION, _migrate_add_duplicate_index),
+    (3, _migrate_add_training_state),
+    (4, _migrate_add_queue_order_indexes),
+    (5, _migrate_add_category_queue_order_indexes),
+    (6, _migrate_add_complaint_counters),
+    (7, _migrate_add_search_index),
+    (8, _migrate_add_epoch_timestamps),
+    (9, _migrate_add_urgency_rank),
+    (10, _migrate_add_duplicate_index_cleanup),
+]
+
+def apply_migrations(cursor):
+    """Apply schema migrations newer than the database's user_version"""
+    cursor.execute('PRAGMA user_version')
+    current_version = cursor.fetchone()[0]
+    
+    for version, migration in SCHEMA_MIGRATIONS:
+        if current_version < version:
+            migration(cursor)
+            cursor.execute(f'PRAGMA user_version = {version}')
+            current_version = version
+    
+    return current_version
+
+def rebuild_complaint_counters(cursor):
+    """Recount complaint_counters from scratch; returns the number of complaints counted"""
+    cursor.execute('DELETE FROM complaint_counters')
+    cursor.execute('''
+        INSERT INTO complaint_counters (status, urgency, category, complaint_count)
+        SELECT status, urgency, category, COUNT(*) FROM complaints
+        GROUP BY status, urgency, category
+    ''')
+    cursor.execute('SELECT COALESCE(SUM(complaint_count), 0) FROM complaint_counters')
+    return cursor.fetchone()[0]
+
+def check_complaint_counters(repair=False):
+    """Compare complaint_counters with a full recount of the complaints table
+    
+    Returns [(status, urgency, category, counter value, actual count)] for
+    every group that differs, or None if the check failed. With repair, the
+    counters are rebuilt when any group differs.
+    """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        created_at = datetime.now().isoformat()
-        
-        # Debug: Print what we're trying to insert
-        print(f"Inserting complaint: user_id={user_id}, category={category}, urgency={urgency}")
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT status, urgency, category, SUM(counted), SUM(actual) FROM (
+                    SELECT status, urgency, category, complaint_count AS counted, 0 AS actual
+                    FROM complaint_counters
+                    UNION ALL
+                    SELECT status, urgency, category, 0, COUNT(*)
+                    FROM complaints
+                    GROUP BY status, urgency, category
+                )
+                GROUP BY status, urgency, category
+                HAVING SUM(counted) != SUM(actual)
+            ''')
+            mismatches = cursor.fetchall()
+            
+            if mismatches and repair:
+                counted = rebuild_complaint_counters(cursor)
+                print(f"🔧 Rebuilt complaint counters: {len(mismatches)} groups were off, {counted} complaints counted")
         
-        cursor.execute('''
-            INSERT INTO complaints 
-            (user_id, category, description, address, landmark, image_path, urgency, 
-             user_priority, status, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (user_id, category, description, address, landmark, image_path, urgency, 
-              user_priority, 'Pending', created_at, created_at))
+        return mismatches
+    
+    except Exception as e:
+        print(f"Error checking complaint counters: {e}")
+        return None
+
+def _read_complaint_counters(cursor, urgency=None, category=None):
+    """[(status, urgency, category, count)] of the non-empty counter groups matching the filters"""
+    conditions, params = ['complaint_count > 0'], []
+    
+    if urgency:
+        conditions.append('urgency = ?')
+        params.append(urgency)
+    if category:
+        conditions.append('category = ?')
+        params.append(category)
+    
+    cursor.execute(f'''
+        SELECT status, urgency, category, complaint_count FROM complaint_counters
+        WHERE {' AND '.join(conditions)}
+    ''', params)
+    return cursor.fetchall()
+
+def _tally_counters(counters, column):
+    """{value: count} of one counter column (0 status, 1 urgency, 2 category)"""
+    totals = {}
+    for row in counters:
+        totals[row[column]] = totals.get(row[column], 0) + row[3]
+    return totals
+
+def get_status_counts(urgency=None, category=None):
+    """Get {status: count} of complaints, optionally for one urgency and category
+    
+    Read from the trigger-maintained complaint_counters table, so the cost
+    does not depend on how many complaints there are.
+    """
+    try:
+        with db_connection() as conn:
+            counters = _read_complaint_counters(conn.cursor(), urgency, category)
         
-        complaint_id = cursor.lastrowid
-        print(f"✅ Complaint inserted with ID: {complaint_id}")
+        status_counts = {status: 0 for status in COMPLAINT_STATUSES}
+        status_counts.update(_tally_counters(counters, 0))
+        return status_counts
+    
+    except Exception as e:
+        print(f"Error getting status counts: {e}")
+        return {status: 0 for status in COMPLAINT_STATUSES}
+
+# Columns of the training_state row, in table order
+TRAINING_STATE_COLUMNS = (
+    'complaints_inserted', 'inserted_at_last_train', 'model_version',
+    'training_type', 'last_trained_at', 'updated_at'
+)
+
+def get_training_state():
+    """Get the training_state row as a dict, or None if the table does not exist yet"""
+    try:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(f'''
+                SELECT {', '.join(TRAINING_STATE_COLUMNS)} FROM training_state WHERE id = 1
+            ''')
+            row = cursor.fetchone()
         
-        # Add to complaint history
-        cursor.execute('''
-            INSERT INTO complaint_history 
-            (complaint_id, old_status, new_status, changed_by, change_reason, changed_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (complaint_id, None, 'Pending', f'user_{user_id}', 'Initial submission', created_at))
+        return dict(zip(TRAINING_STATE_COLUMNS, row)) if row else None
+    
+    except Exception as e:
+        print(f"Error getting training state: {e}")
+        return None
+
+def record_training_run(inserted_at_last_train, model_version=None, training_type=None, trained_at=None):
+    """Record that a model was trained on the complaints inserted up to a counter value"""
+    try:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            now = datetime.now().isoformat()
+            cursor.execute('''
+                UPDATE training_state
+                SET inserted_at_last_train = ?, model_version = ?, training_type = ?,
+                    last_trained_at = ?, updated_at = ?
+                WHERE id = 1
+            ''', (inserted_at_last_train, model_version, training_type, trained_at or now, now))
         
-        conn.commit()
-        conn.close()
+        return cursor.rowcount == 1
+    
+    except Exception as e:
+        print(f"Error recording training run: {e}")
+        return False
+
+def add_complaint(user_id, category, description, address, landmark=None, image_path=None, urgency='Medium', user_priority='Medium'):
+    """Add a new complaint to the database"""
+    try:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            created_at = datetime.now().isoformat()
+            
+            # Debug: Print what we're trying to insert
+            print(f"Inserting complaint: user_id={user_id}, category={category}, urgency={urgency}")
+            
+            # Normalized model feature text is stored once so retraining never recomputes it
+            combined_features = create_features(description, category)
+            
+            # Link to an open complaint about the same incident, found via the LSH index
+            signature = minhash_signature(description, address)
+            duplicate_of = None
+            try:
+                duplicate_of, similarity = find_duplicate(cursor, signature, category)
+            except sqlite3.Error as e:
+                print(f"⚠️ Near-duplicate lookup failed: {e}")
+            
+            cursor.execute('''
+                INSERT INTO complaints 
+                (user_id, category, description, address, landmark, image_path, urgency, 
+                 user_priority, status, created_at, updated_at, combined_features, duplicate_of)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (user_id, category, description, address, landmark, image_path, urgency, 
+                  user_priority, 'Pending', created_at, created_at, combined_features, duplicate_of))
+            
+            complaint_id = cursor.lastrowid
+            print(f"✅ Complaint inserted with ID: {complaint_id}")
+            
+            if duplicate_of is not None:
+                print(f"🔁 Complaint {complaint_id} looks like a duplicate of {duplicate_of} (similarity {similarity:.2f})")
+            
+            try:
+                index_complaint(cursor, complaint_id, signature)
+            except sqlite3.Error as e:
+                print(f"⚠️ Near-duplicate indexing failed: {e}")
+            
+            # Add to complaint history
+            cursor.execute('''
+                INSERT INTO complaint_history 
+                (complaint_id, old_status, new_status, changed_by, change_reason, changed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (complaint_id, None, 'Pending', f'user_{user_id}', 'Initial submission', created_at))
         
         print(f"✅ Complaint {complaint_id} successfully saved to database")
         return complaint_id
@@ -171,24 +861,17 @@ def add_complaint(user_id, category, description, address, landmark=None, image_
 def get_all_complaints():
     """Get all complaints from the database"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, user_id, category, description, address, landmark, 
-                   image_path, urgency, status, created_at, updated_at
-            FROM complaints
-            ORDER BY 
-                CASE urgency 
-                    WHEN 'High' THEN 1 
-                    WHEN 'Medium' THEN 2 
-                    WHEN 'Low' THEN 3 
-                END,
-                created_at ASC
-        ''')
-        
-        complaints = cursor.fetchall()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT id, user_id, category, description, address, landmark, 
+                       image_path, urgency, status, created_at, updated_at
+                FROM complaints
+                ORDER BY urgency_rank, created_at, id
+            ''')
+            
+            complaints = cursor.fetchall()
         
         return complaints
     
@@ -196,22 +879,183 @@ def get_all_complaints():
         print(f"Error getting complaints: {e}")
         return []
 
+def build_complaint_filters(status=None, urgency=None, category=None, user_id=None):
+    """WHERE conditions and parameters for the complaint filters that are set
+    
+    A known urgency is filtered by its stored rank, so the queue-order
+    indexes seek straight to it. OPEN_STATUS selects every complaint not
+    yet resolved.
+    """
+    conditions, params = [], []
+    
+    if status == OPEN_STATUS:
+        conditions.append(OPEN_STATUS_SQL)
+    elif status:
+        conditions.append('status = ?')
+        params.append(status)
+    if category:
+        conditions.append('category = ?')
+        params.append(category)
+    if user_id is not None:
+        conditions.append('user_id = ?')
+        params.append(user_id)
+    if urgency in URGENCY_RANKS:
+        conditions.append('urgency_rank = ?')
+        params.append(URGENCY_RANKS[urgency])
+    elif urgency:
+        conditions.append('urgency = ?')
+        params.append(urgency)
+    
+    return conditions, params
+
+def _complaint_page_query(conditions, params, order, after, limit, rank_pinned=False):
+    """SQL and parameters for one keyset page of complaints in a queue order
+    
+    The order's sort keys are selected after the 11 complaint columns. after
+    is the previous page's last sort keys; the page starts right after them
+    with an index seek, so fetching any page costs the same however deep it is.
+    """
+    order_keys, descending = QUEUE_ORDERS[order]
+    direction = 'DESC' if descending else 'ASC'
+    comparison = '<' if descending else '>'
+    
+    # A rank pinned by the urgency filter is constant; seeking from it would
+    # read on through the following ranks and sort what it found
+    keys = order_keys[1:] if rank_pinned and order_keys[0] == 'urgency_rank' else order_keys
+    
+    where = list(conditions)
+    query_params = list(params)
+    if after is not None:
+        where.append(f"({', '.join(keys)}) {comparison} ({', '.join('?' * len(keys))})")
+        query_params += list(after)[len(order_keys) - len(keys):]
+    
+    query = f'''
+        SELECT id, user_id, category, description, address, landmark, 
+               image_path, urgency, status, created_at, updated_at,
+               {', '.join(f'{key} AS sort_key_{i}' for i, key in enumerate(order_keys))}
+        FROM complaints
+        {'WHERE ' + ' AND '.join(where) if where else ''}
+        ORDER BY {', '.join(f'{key} {direction}' for key in keys)}
+        LIMIT ?
+    '''
+    return query, query_params + [limit]
+
+def get_complaint_queue(status=None, urgency=None, category=None, order='priority', after=None,
+                        page_size=QUEUE_PAGE_SIZE, user_id=None, include_counts=True):
+    """Get one page of the filtered complaint queue and the counts for its status tiles
+    
+    Runs at most two statements: the page, read with an index seek in the
+    chosen QUEUE_ORDERS order, and the count of each status under the
+    urgency, category and user filters (the status filter is left out so
+    every tile keeps its number), read from complaint_counters unless a
+    user is given. status may be OPEN_STATUS for every complaint not yet
+    resolved. after is the next_cursor of the previous page. Returns
+    {'complaints': rows, 'next_cursor': cursor or None,
+    'status_counts': {status: count}, 'total': count}.
+    """
+    if order not in QUEUE_ORDERS:
+        raise ValueError(f"Unknown queue order: {order}")
+    
+    conditions, params = build_complaint_filters(status, urgency, category, user_id)
+    
+    # One extra row tells whether another page follows
+    query, query_params = _complaint_page_query(
+        conditions, params, order, after, page_size + 1, rank_pinned=urgency in URGENCY_RANKS
+    )
+    
+    try:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, query_params)
+            rows = cursor.fetchall()
+            
+            status_counts = {}
+            if include_counts and user_id is None:
+                status_counts = {status_name: 0 for status_name in COMPLAINT_STATUSES}
+                status_counts.update(_tally_counters(_read_complaint_counters(cursor, urgency, category), 0))
+            elif include_counts:
+                # complaint_counters has no per-user groups, so count each
+                # status among the user's complaints instead
+                count_conditions, count_params = build_complaint_filters(None, urgency, category, user_id)
+                count_where = ' AND '.join(['status = ?'] + count_conditions)
+                cursor.execute(
+                    'SELECT ' + ', '.join([f'(SELECT COUNT(*) FROM complaints WHERE {count_where})'] * len(COMPLAINT_STATUSES)),
+                    [value for status_name in COMPLAINT_STATUSES for value in [status_name] + count_params]
+                )
+                status_counts = dict(zip(COMPLAINT_STATUSES, cursor.fetchone()))
+        
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = tuple(rows[-1][11:]) if has_more else None
+        
+        return {
+            'complaints': [row[:11] for row in rows],
+            'next_cursor': next_cursor,
+            'status_counts': status_counts,
+            'total': sum(status_counts.values())
+        }
+    
+    except Exception as e:
+        print(f"Error getting complaint queue: {e}")
+        return {'complaints': [], 'next_cursor': None, 'status_counts': {}, 'total': 0}
+
+def get_all_complaints_page(after=None, page_size=QUEUE_PAGE_SIZE):
+    """Get one page of all complaints in queue order; returns (rows, next cursor)"""
+    queue = get_complaint_queue(after=after, page_size=page_size, include_counts=False)
+    return queue['complaints'], queue['next_cursor']
+
+def get_complaints_by_status_page(status, after=None, page_size=QUEUE_PAGE_SIZE):
+    """Get one page of complaints with a status in queue order; returns (rows, next cursor)"""
+    queue = get_complaint_queue(status=status, after=after, page_size=page_size, include_counts=False)
+    return queue['complaints'], queue['next_cursor']
+
+def get_user_complaints_page(user_id, after=None, page_size=QUEUE_PAGE_SIZE):
+    """Get one page of a user's complaints in queue order; returns (rows, next cursor)"""
+    queue = get_complaint_queue(user_id=user_id, after=after, page_size=page_size, include_counts=False)
+    return queue['complaints'], queue['next_cursor']
+
+def get_duplicate_links(complaint_ids=None):
+    """Get {complaint_id: original complaint_id} for complaints linked as duplicates
+    
+    Pass complaint_ids to look up only those complaints, such as one queue page.
+    """
+    try:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            if complaint_ids is None:
+                cursor.execute('SELECT id, duplicate_of FROM complaints WHERE duplicate_of IS NOT NULL')
+            else:
+                ids = [int(complaint_id) for complaint_id in complaint_ids]
+                if not ids:
+                    return {}
+                cursor.execute(f'''
+                    SELECT id, duplicate_of FROM complaints
+                    WHERE duplicate_of IS NOT NULL AND id IN ({', '.join('?' * len(ids))})
+                ''', ids)
+            links = dict(cursor.fetchall())
+        
+        return links
+    
+    except Exception as e:
+        print(f"Error getting duplicate links: {e}")
+        return {}
+
 def get_user_complaints(user_id):
     """Get all complaints submitted by a specific user"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, user_id, category, description, address, landmark, 
-                   image_path, urgency, status, created_at, updated_at
-            FROM complaints
-            WHERE user_id = ?
-            ORDER BY created_at DESC
-        ''', (user_id,))
-        
-        complaints = cursor.fetchall()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT id, user_id, category, description, address, landmark, 
+                       image_path, urgency, status, created_at, updated_at
+                FROM complaints
+                WHERE user_id = ?
+                ORDER BY created_at DESC
+            ''', (user_id,))
+            
+            complaints = cursor.fetchall()
         
         return complaints
     
@@ -222,19 +1066,18 @@ def get_user_complaints(user_id):
 def get_complaints_by_status(status):
     """Get complaints filtered by status"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, user_id, category, description, address, landmark, 
-                   image_path, urgency, status, created_at, updated_at
-            FROM complaints
-            WHERE status = ?
-            ORDER BY created_at DESC
-        ''', (status,))
-        
-        complaints = cursor.fetchall()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT id, user_id, category, description, address, landmark, 
+                       image_path, urgency, status, created_at, updated_at
+                FROM complaints
+                WHERE status = ?
+                ORDER BY created_at DESC
+            ''', (status,))
+            
+            complaints = cursor.fetchall()
         
         return complaints
     
@@ -245,54 +1088,50 @@ def get_complaints_by_status(status):
 def update_complaint_status(complaint_id, new_status, agent_id=None, resolution_notes=None):
     """Update complaint status with history tracking"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get current status
-        cursor.execute('SELECT status FROM complaints WHERE id = ?', (complaint_id,))
-        result = cursor.fetchone()
-        
-        if not result:
-            conn.close()
-            return False
-        
-        old_status = result[0]
-        updated_at = datetime.now().isoformat()
-        
-        # Update complaint
-        if new_status == 'Resolved':
-            cursor.execute('''
-                UPDATE complaints
-                SET status = ?, assigned_agent = ?, resolution_notes = ?, 
-                    updated_at = ?, resolved_at = ?
-                WHERE id = ?
-            ''', (new_status, agent_id, resolution_notes, updated_at, updated_at, complaint_id))
-            
-            # Update agent's resolved count
-            if agent_id:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Get current status
+            cursor.execute('SELECT status FROM complaints WHERE id = ?', (complaint_id,))
+            result = cursor.fetchone()
+            
+            if not result:
+                return False
+            
+            old_status = result[0]
+            updated_at = datetime.now().isoformat()
+            
+            # Update complaint
+            if new_status == 'Resolved':
                 cursor.execute('''
-                    UPDATE agents 
-                    SET total_resolved = total_resolved + 1 
-                    WHERE agent_id = ?
-                ''', (agent_id,))
-        
-        else:
+                    UPDATE complaints
+                    SET status = ?, assigned_agent = ?, resolution_notes = ?, 
+                        updated_at = ?, resolved_at = ?
+                    WHERE id = ?
+                ''', (new_status, agent_id, resolution_notes, updated_at, updated_at, complaint_id))
+                
+                # Update agent's resolved count
+                if agent_id:
+                    cursor.execute('''
+                        UPDATE agents 
+                        SET total_resolved = total_resolved + 1 
+                        WHERE agent_id = ?
+                    ''', (agent_id,))
+            
+            else:
+                cursor.execute('''
+                    UPDATE complaints
+                    SET status = ?, assigned_agent = ?, updated_at = ?
+                    WHERE id = ?
+                ''', (new_status, agent_id, updated_at, complaint_id))
+            
+            # Add to history
             cursor.execute('''
-                UPDATE complaints
-                SET status = ?, assigned_agent = ?, updated_at = ?
-                WHERE id = ?
-            ''', (new_status, agent_id, updated_at, complaint_id))
-        
-        # Add to history
-        cursor.execute('''
-            INSERT INTO complaint_history 
-            (complaint_id, old_status, new_status, changed_by, change_reason, changed_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (complaint_id, old_status, new_status, agent_id or 'system', 
-              f'Status changed from {old_status} to {new_status}', updated_at))
-        
-        conn.commit()
-        conn.close()
+                INSERT INTO complaint_history 
+                (complaint_id, old_status, new_status, changed_by, change_reason, changed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (complaint_id, old_status, new_status, agent_id or 'system', 
+                  f'Status changed from {old_status} to {new_status}', updated_at))
         
         return True
     
@@ -300,87 +1139,89 @@ def update_complaint_status(complaint_id, new_status, agent_id=None, resolution_
         print(f"Error updating complaint status: {e}")
         return False
 
+# Aggregates that complaint_counters cannot answer. Each is a range or
+# scan over one of the epoch indexes; :today, :tomorrow and :week_ago are
+# epoch seconds. The unary + keeps the status index from being picked over
+# the covering resolved_epoch index.
+COMPLAINT_AGGREGATES = {
+    'submitted_today': "SELECT COUNT(*) FROM complaints WHERE created_epoch >= :today AND created_epoch < :tomorrow",
+    'resolved_today': "SELECT COUNT(*) FROM complaints WHERE resolved_epoch >= :today AND resolved_epoch < :tomorrow",
+    'recent_complaints': "SELECT COUNT(*) FROM complaints WHERE created_epoch >= :week_ago",
+    'avg_resolution_time': """SELECT AVG(resolved_epoch - created_epoch) / 3600.0 FROM complaints
+                              WHERE resolved_epoch IS NOT NULL AND +status = 'Resolved'""",
+    'avg_response_time': """SELECT AVG(updated_epoch - created_epoch) / 3600.0 FROM complaints
+                            WHERE status != 'Pending'""",
+}
+
+def aggregate_params():
+    """Epoch bounds for COMPLAINT_AGGREGATES: the start of today and tomorrow, and a week ago"""
+    now = datetime.now()
+    today = to_epoch(now.date())
+    return {'today': today, 'tomorrow': today + 86400, 'week_ago': to_epoch(now - timedelta(days=7))}
+
+def _aggregate_complaints(cursor, names):
+    """Compute the named COMPLAINT_AGGREGATES in one statement"""
+    cursor.execute(
+        f"SELECT {', '.join(f'({COMPLAINT_AGGREGATES[name]})' for name in names)}",
+        aggregate_params()
+    )
+    return {name: value or 0 for name, value in zip(names, cursor.fetchone())}
+
+def _get_agent_workload(cursor):
+    """{agent_id: (complaints assigned, resolved)} from the (assigned_agent, status) index"""
+    cursor.execute('''
+        SELECT assigned_agent, COUNT(*), SUM(status = 'Resolved')
+        FROM complaints
+        WHERE assigned_agent IS NOT NULL
+        GROUP BY assigned_agent
+    ''')
+    return {agent_id: (total, resolved) for agent_id, total, resolved in cursor.fetchall()}
+
 def get_complaint_stats():
-    """Get comprehensive complaint statistics"""
+    """Get comprehensive complaint statistics
+    
+    Status, urgency and category totals come from complaint_counters and
+    the date-based figures from the epoch timestamp indexes.
+    """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        stats = {}
-        
-        # Basic counts
-        cursor.execute('SELECT COUNT(*) FROM complaints')
-        stats['total'] = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM complaints WHERE status = "Pending"')
-        stats['pending'] = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM complaints WHERE status = "In Progress"')
-        stats['in_progress'] = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM complaints WHERE status = "Resolved"')
-        stats['resolved'] = cursor.fetchone()[0]
-        
-        # Urgency distribution
-        cursor.execute('SELECT COUNT(*) FROM complaints WHERE urgency = "High"')
-        stats['high_urgency'] = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM complaints WHERE urgency = "Medium"')
-        stats['medium_urgency'] = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM complaints WHERE urgency = "Low"')
-        stats['low_urgency'] = cursor.fetchone()[0]
-        
-        # Today's statistics
-        today = datetime.now().date().isoformat()
-        cursor.execute('''
-            SELECT COUNT(*) FROM complaints 
-            WHERE DATE(created_at) = ?
-        ''', (today,))
-        stats['submitted_today'] = cursor.fetchone()[0]
-        
-        cursor.execute('''
-            SELECT COUNT(*) FROM complaints 
-            WHERE DATE(resolved_at) = ?
-        ''', (today,))
-        stats['resolved_today'] = cursor.fetchone()[0]
-        
-        # Average resolution time (for resolved complaints)
-        cursor.execute('''
-            SELECT AVG(
-                (JULIANDAY(resolved_at) - JULIANDAY(created_at)) * 24
-            ) as avg_hours
-            FROM complaints
-            WHERE status = 'Resolved' AND resolved_at IS NOT NULL
-        ''')
-        result = cursor.fetchone()
-        stats['avg_resolution_time'] = result[0] if result[0] else 0
-        
-        # Category distribution
-        cursor.execute('''
-            SELECT category, COUNT(*) as count
-            FROM complaints
-            GROUP BY category
-            ORDER BY count DESC
-        ''')
-        stats['category_distribution'] = cursor.fetchall()
-        
-        # Agent performance
-        cursor.execute('''
-            SELECT 
-                a.name,
-                a.agent_id,
-                COUNT(c.id) as total_assigned,
-                SUM(CASE WHEN c.status = 'Resolved' THEN 1 ELSE 0 END) as resolved_count
-            FROM agents a
-            LEFT JOIN complaints c ON c.assigned_agent = a.agent_id
-            WHERE a.status = 'active'
-            GROUP BY a.id, a.name, a.agent_id
-            ORDER BY resolved_count DESC
-        ''')
-        stats['agent_performance'] = cursor.fetchall()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            stats = {}
+            
+            # Basic counts
+            counters = _read_complaint_counters(cursor)
+            by_status = _tally_counters(counters, 0)
+            by_urgency = _tally_counters(counters, 1)
+            by_category = _tally_counters(counters, 2)
+            
+            stats['total'] = sum(by_status.values())
+            stats['pending'] = by_status.get('Pending', 0)
+            stats['in_progress'] = by_status.get('In Progress', 0)
+            stats['resolved'] = by_status.get('Resolved', 0)
+            
+            # Urgency distribution
+            stats['high_urgency'] = by_urgency.get('High', 0)
+            stats['medium_urgency'] = by_urgency.get('Medium', 0)
+            stats['low_urgency'] = by_urgency.get('Low', 0)
+            stats['urgency_distribution'] = sorted(
+                by_urgency.items(), key=lambda item: URGENCY_RANKS.get(item[0], len(URGENCY_RANKS) + 1)
+            )
+            
+            # Category distribution
+            stats['category_distribution'] = sorted(by_category.items(), key=lambda item: -item[1])
+            
+            # Today's statistics and average resolution time (for resolved complaints)
+            stats.update(_aggregate_complaints(cursor, ['submitted_today', 'resolved_today', 'avg_resolution_time']))
+            
+            # Agent performance
+            workload = _get_agent_workload(cursor)
+            cursor.execute("SELECT name, agent_id FROM agents WHERE status = 'active'")
+            stats['agent_performance'] = sorted(
+                [(name, agent_id) + workload.get(agent_id, (0, 0)) for name, agent_id in cursor.fetchall()],
+                key=lambda agent: -agent[3]
+            )
         
-        conn.close()
         return stats
     
     except Exception as e:
@@ -389,113 +1230,151 @@ def get_complaint_stats():
             'total': 0, 'pending': 0, 'in_progress': 0, 'resolved': 0,
             'high_urgency': 0, 'medium_urgency': 0, 'low_urgency': 0,
             'submitted_today': 0, 'resolved_today': 0, 'avg_resolution_time': 0,
-            'category_distribution': [], 'agent_performance': []
+            'urgency_distribution': [], 'category_distribution': [], 'agent_performance': []
         }
 
 def get_complaint_by_id(complaint_id):
     """Get detailed complaint information by ID"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT c.*, u.name as user_name, u.email as user_email,
-                   a.name as agent_name
-            FROM complaints c
-            LEFT JOIN users u ON c.user_id = u.id
-            LEFT JOIN agents a ON c.assigned_agent = a.agent_id
-            WHERE c.id = ?
-        ''', (complaint_id,))
-        
-        complaint = cursor.fetchone()
-        
-        if complaint:
-            # Get complaint history
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
             cursor.execute('''
-                SELECT old_status, new_status, changed_by, change_reason, changed_at
-                FROM complaint_history
-                WHERE complaint_id = ?
-                ORDER BY changed_at ASC
+                SELECT c.*, u.name as user_name, u.email as user_email,
+                       a.name as agent_name
+                FROM complaints c
+                LEFT JOIN users u ON c.user_id = u.id
+                LEFT JOIN agents a ON c.assigned_agent = a.agent_id
+                WHERE c.id = ?
             ''', (complaint_id,))
             
-            history = cursor.fetchall()
+            complaint = cursor.fetchone()
             
-            conn.close()
-            return {
-                'complaint': complaint,
-                'history': history
-            }
+            if complaint:
+                # Get complaint history
+                cursor.execute('''
+                    SELECT old_status, new_status, changed_by, change_reason, changed_at
+                    FROM complaint_history
+                    WHERE complaint_id = ?
+                    ORDER BY changed_at ASC
+                ''', (complaint_id,))
+                
+                history = cursor.fetchall()
+                
+                return {
+                    'complaint': complaint,
+                    'history': history
+                }
         
-        conn.close()
         return None
     
     except Exception as e:
         print(f"Error getting complaint by ID: {e}")
         return None
 
-def search_complaints(search_term, filters=None):
-    """Search complaints with optional filters"""
+def build_search_query(search_term):
+    """FTS5 query for a search box term: every word must match the start of a word
+    
+    Words are quoted so FTS5 operators and punctuation in the term are
+    matched literally. Returns None when the term has no words.
+    """
+    words = re.findall(r'\w+', search_term or '')
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+# Columns of a search_complaints() row, in order
+SEARCH_COLUMNS = ('id', 'user_id', 'category', 'description', 'address', 'landmark',
+                  'image_path', 'urgency', 'status', 'created_at', 'updated_at')
+SEARCH_COLUMNS_SQL = ', '.join(f'c.{column}' for column in SEARCH_COLUMNS)
+
+def search_complaints(search_term, filters=None, limit=None, include_snippets=False):
+    """Search complaints with optional filters
+    
+    Every word of the term must start a word in the description, address,
+    landmark or category; matches are ranked best first by BM25 over the
+    complaints_fts index. Without the index, or for an empty term, a LIKE
+    scan ordered newest first is used instead. filters may hold status,
+    urgency, category, date_from and date_to.
+    
+    Rows have the 11 SEARCH_COLUMNS (id, user_id, category, description,
+    address, landmark, image_path, urgency, status, created_at,
+    updated_at) on both paths. With include_snippets, returns
+    {'complaints': rows, 'snippets': {complaint_id: snippet}} instead,
+    where a snippet is the description with the matches in bold (the
+    plain description on the LIKE path).
+    """
+    conditions, params = [], []
+    
+    # Add filters
+    if filters:
+        for column in ('status', 'urgency', 'category'):
+            if filters.get(column):
+                conditions.append(f'c.{column} = ?')
+                params.append(filters[column])
+        
+        # Whole days as a range on the created_epoch index
+        if filters.get('date_from'):
+            conditions.append('c.created_epoch >= ?')
+            params.append(to_epoch(filters['date_from']))
+        
+        if filters.get('date_to'):
+            conditions.append('c.created_epoch < ?')
+            params.append(to_epoch(filters['date_to']) + 86400)
+    
+    match = build_search_query(search_term)
+    
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Base query
-        query = '''
-            SELECT id, user_id, category, description, address, landmark, 
-                   image_path, urgency, status, created_at, updated_at
-            FROM complaints
-            WHERE (description LIKE ? OR address LIKE ? OR category LIKE ?)
-        '''
-        
-        params = [f'%{search_term}%', f'%{search_term}%', f'%{search_term}%']
-        
-        # Add filters
-        if filters:
-            if filters.get('status'):
-                query += ' AND status = ?'
-                params.append(filters['status'])
-            
-            if filters.get('urgency'):
-                query += ' AND urgency = ?'
-                params.append(filters['urgency'])
+        with db_connection() as conn:
+            cursor = conn.cursor()
             
-            if filters.get('category'):
-                query += ' AND category = ?'
-                params.append(filters['category'])
+            if match and table_exists(cursor, 'complaints_fts'):
+                weights = ', '.join(str(weight) for weight in SEARCH_COLUMN_WEIGHTS)
+                query = f'''
+                    SELECT {SEARCH_COLUMNS_SQL}, snippet(complaints_fts, 0, '**', '**', '…', 12)
+                    FROM complaints_fts
+                    JOIN complaints c ON c.id = complaints_fts.rowid
+                    WHERE {' AND '.join(['complaints_fts MATCH ?'] + conditions)}
+                    ORDER BY bm25(complaints_fts, {weights})
+                '''
+                params = [match] + params
+            else:
+                if search_term:
+                    conditions.insert(0, '(c.description LIKE ? OR c.address LIKE ? OR c.category LIKE ?)')
+                    params = [f'%{search_term}%'] * 3 + params
+                query = f'''
+                    SELECT {SEARCH_COLUMNS_SQL}, c.description
+                    FROM complaints c
+                    {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+                    ORDER BY c.created_epoch DESC, c.id DESC
+                '''
             
-            if filters.get('date_from'):
-                query += ' AND DATE(created_at) >= ?'
-                params.append(filters['date_from'])
+            if limit:
+                query += ' LIMIT ?'
+                params.append(limit)
             
-            if filters.get('date_to'):
-                query += ' AND DATE(created_at) <= ?'
-                params.append(filters['date_to'])
-        
-        query += ' ORDER BY created_at DESC'
-        
-        cursor.execute(query, params)
-        complaints = cursor.fetchall()
-        conn.close()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
         
+        complaints = [row[:len(SEARCH_COLUMNS)] for row in rows]
+        if include_snippets:
+            return {'complaints': complaints, 'snippets': {row[0]: row[-1] for row in rows}}
         return complaints
     
     except Exception as e:
         print(f"Error searching complaints: {e}")
-        return []
+        return {'complaints': [], 'snippets': {}} if include_snippets else []
 
 def add_feedback(complaint_id, user_id, rating, comments):
     """Add citizen feedback for a resolved complaint"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO feedback (complaint_id, user_id, rating, comments, created_at)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (complaint_id, user_id, rating, comments, datetime.now().isoformat()))
-        
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                INSERT INTO feedback (complaint_id, user_id, rating, comments, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (complaint_id, user_id, rating, comments, datetime.now().isoformat()))
         
         return True
     
@@ -506,19 +1385,18 @@ def add_feedback(complaint_id, user_id, rating, comments):
 def get_complaint_feedback(complaint_id):
     """Get feedback for a specific complaint"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT f.rating, f.comments, f.created_at, u.name
-            FROM feedback f
-            JOIN users u ON f.user_id = u.id
-            WHERE f.complaint_id = ?
-            ORDER BY f.created_at DESC
-        ''', (complaint_id,))
-        
-        feedback = cursor.fetchall()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT f.rating, f.comments, f.created_at, u.name
+                FROM feedback f
+                JOIN users u ON f.user_id = u.id
+                WHERE f.complaint_id = ?
+                ORDER BY f.created_at DESC
+            ''', (complaint_id,))
+            
+            feedback = cursor.fetchall()
         
         return feedback
     
@@ -530,11 +1408,10 @@ def cleanup_old_images():
     """Clean up orphaned image files"""
     try:
         # Get all image paths from database
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT DISTINCT image_path FROM complaints WHERE image_path IS NOT NULL')
-        db_images = set(row[0] for row in cursor.fetchall() if row[0])
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT DISTINCT image_path FROM complaints WHERE image_path IS NOT NULL')
+            db_images = set(row[0] for row in cursor.fetchall() if row[0])
         
         # Get all actual image files
         images_dir = "assets/uploaded_images"
@@ -563,6 +1440,51 @@ def cleanup_old_images():
         print(f"Error cleaning up images: {e}")
         return 0
 
+def build_export_query(filters=None):
+    """SQL and parameters of the complaint export, newest first, with optional filters"""
+    query = '''
+        SELECT 
+            c.id, c.category, c.description, c.address, c.landmark,
+            c.urgency, c.user_priority, c.status, c.created_at, c.updated_at,
+            c.resolved_at, u.name as user_name, u.email as user_email,
+            a.name as agent_name, a.agent_id
+        FROM complaints c
+        LEFT JOIN users u ON c.user_id = u.id
+        LEFT JOIN agents a ON c.assigned_agent = a.agent_id
+    '''
+    
+    params = []
+    
+    if filters:
+        where_conditions = []
+        
+        if filters.get('status'):
+            where_conditions.append('c.status = ?')
+            params.append(filters['status'])
+        
+        if filters.get('urgency'):
+            where_conditions.append('c.urgency = ?')
+            params.append(filters['urgency'])
+        
+        if filters.get('category'):
+            where_conditions.append('c.category = ?')
+            params.append(filters['category'])
+        
+        # Whole days as a range on the created_epoch index, which also gives the order
+        if filters.get('date_from'):
+            where_conditions.append('c.created_epoch >= ?')
+            params.append(to_epoch(filters['date_from']))
+        
+        if filters.get('date_to'):
+            where_conditions.append('c.created_epoch < ?')
+            params.append(to_epoch(filters['date_to']) + 86400)
+        
+        if where_conditions:
+            query += ' WHERE ' + ' AND '.join(where_conditions)
+    
+    query += ' ORDER BY c.created_epoch DESC, c.id DESC'
+    return query, params
+
 def export_complaints_to_csv(filename=None, filters=None):
     """Export complaints to CSV with optional filters"""
     try:
@@ -570,52 +1492,13 @@ def export_complaints_to_csv(filename=None, filters=None):
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"complaints_export_{timestamp}.csv"
         
-        conn = get_db_connection()
+        query, params = build_export_query(filters)
         
-        # Build query with filters
-        query = '''
-            SELECT 
-                c.id, c.category, c.description, c.address, c.landmark,
-                c.urgency, c.user_priority, c.status, c.created_at, c.updated_at,
-                c.resolved_at, u.name as user_name, u.email as user_email,
-                a.name as agent_name, a.agent_id
-            FROM complaints c
-            LEFT JOIN users u ON c.user_id = u.id
-            LEFT JOIN agents a ON c.assigned_agent = a.agent_id
-        '''
-        
-        params = []
-        
-        if filters:
-            where_conditions = []
-            
-            if filters.get('status'):
-                where_conditions.append('c.status = ?')
-                params.append(filters['status'])
-            
-            if filters.get('urgency'):
-                where_conditions.append('c.urgency = ?')
-                params.append(filters['urgency'])
-            
-            if filters.get('category'):
-                where_conditions.append('c.category = ?')
-                params.append(filters['category'])
-            
-            if filters.get('date_from'):
-                where_conditions.append('DATE(c.created_at) >= ?')
-                params.append(filters['date_from'])
+        with db_connection() as conn:
+            # pandas is only needed for exports, so it is not imported at startup
+            import pandas as pd
             
-            if filters.get('date_to'):
-                where_conditions.append('DATE(c.created_at) <= ?')
-                params.append(filters['date_to'])
-            
-            if where_conditions:
-                query += ' WHERE ' + ' AND '.join(where_conditions)
-        
-        query += ' ORDER BY c.created_at DESC'
-        
-        df = pd.read_sql_query(query, conn, params=params)
-        conn.close()
+            df = pd.read_sql_query(query, conn, params=params)
         
         df.to_csv(filename, index=False)
         return filename
@@ -631,8 +1514,14 @@ def backup_database(backup_path=None):
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_path = f"db/backup_complaints_{timestamp}.db"
         
-        import shutil
-        shutil.copy2(DATABASE_PATH, backup_path)
+        # The online backup API includes pages still in the WAL file, which a file copy would miss
+        with db_connection() as conn:
+            backup_conn = sqlite3.connect(backup_path)
+            try:
+                conn.backup(backup_conn)
+            finally:
+                backup_conn.close()
+        
         return backup_path
     
     except Exception as e:
@@ -642,49 +1531,25 @@ def backup_database(backup_path=None):
 def get_dashboard_summary():
     """Get summary data for dashboard displays"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        summary = {}
-        
-        # Recent complaints (last 7 days)
-        week_ago = (datetime.now() - timedelta(days=7)).isoformat()
-        cursor.execute('''
-            SELECT COUNT(*) FROM complaints 
-            WHERE created_at >= ?
-        ''', (week_ago,))
-        summary['recent_complaints'] = cursor.fetchone()[0]
-        
-        # Urgent complaints needing attention
-        cursor.execute('''
-            SELECT COUNT(*) FROM complaints 
-            WHERE urgency = 'High' AND status IN ('Pending', 'In Progress')
-        ''')
-        summary['urgent_pending'] = cursor.fetchone()[0]
-        
-        # Average response time for resolved complaints
-        cursor.execute('''
-            SELECT AVG(
-                (JULIANDAY(updated_at) - JULIANDAY(created_at)) * 24
-            ) as avg_response_hours
-            FROM complaints
-            WHERE status != 'Pending'
-        ''')
-        result = cursor.fetchone()
-        summary['avg_response_time'] = result[0] if result[0] else 0
-        
-        # Most common complaint category
-        cursor.execute('''
-            SELECT category, COUNT(*) as count
-            FROM complaints
-            GROUP BY category
-            ORDER BY count DESC
-            LIMIT 1
-        ''')
-        result = cursor.fetchone()
-        summary['top_category'] = result[0] if result else 'None'
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            summary = {}
+            counters = _read_complaint_counters(cursor)
+            
+            # Recent complaints (last 7 days) and average response time
+            summary.update(_aggregate_complaints(cursor, ['recent_complaints', 'avg_response_time']))
+            
+            # Urgent complaints needing attention
+            summary['urgent_pending'] = sum(
+                count for status, urgency, _, count in counters
+                if urgency == 'High' and status in ('Pending', 'In Progress')
+            )
+            
+            # Most common complaint category
+            by_category = _tally_counters(counters, 2)
+            summary['top_category'] = max(by_category, key=by_category.get) if by_category else 'None'
         
-        conn.close()
         return summary
     
     except Exception as e:
@@ -701,48 +1566,46 @@ def test_database_connection():
     try:
         print("🧪 Testing database connection...")
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Test if tables exist
-        cursor.execute("""
-            SELECT name FROM sqlite_master 
-            WHERE type='table' AND name IN ('users', 'agents', 'complaints')
-        """)
-        tables = cursor.fetchall()
-        print(f"✅ Found tables: {[table[0] for table in tables]}")
-        
-        # Test complaints table structure
-        cursor.execute("PRAGMA table_info(complaints)")
-        columns = cursor.fetchall()
-        print(f"✅ Complaints table columns: {[col[1] for col in columns]}")
-        
-        # Test inserting a sample complaint (if user exists)
-        cursor.execute("SELECT id FROM users LIMIT 1")
-        user = cursor.fetchone()
-        
-        if user:
-            user_id = user[0]
-            test_complaint_id = add_complaint(
-                user_id=user_id,
-                category="Test Category",
-                description="Test complaint for database verification",
-                address="Test Address",
-                urgency="Medium"
-            )
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Test if tables exist
+            cursor.execute("""
+                SELECT name FROM sqlite_master 
+                WHERE type='table' AND name IN ('users', 'agents', 'complaints')
+            """)
+            tables = cursor.fetchall()
+            print(f"✅ Found tables: {[table[0] for table in tables]}")
+            
+            # Test complaints table structure
+            cursor.execute("PRAGMA table_info(complaints)")
+            columns = cursor.fetchall()
+            print(f"✅ Complaints table columns: {[col[1] for col in columns]}")
+            
+            # Test inserting a sample complaint (if user exists)
+            cursor.execute("SELECT id FROM users LIMIT 1")
+            user = cursor.fetchone()
             
-            if test_complaint_id:
-                print(f"✅ Test complaint created with ID: {test_complaint_id}")
-                # Clean up test complaint
-                cursor.execute("DELETE FROM complaints WHERE id = ?", (test_complaint_id,))
-                conn.commit()
-                print("✅ Test complaint cleaned up")
+            if user:
+                user_id = user[0]
+                test_complaint_id = add_complaint(
+                    user_id=user_id,
+                    category="Test Category",
+                    description="Test complaint for database verification",
+                    address="Test Address",
+                    urgency="Medium"
+                )
+                
+                if test_complaint_id:
+                    print(f"✅ Test complaint created with ID: {test_complaint_id}")
+                    # Clean up test complaint
+                    cursor.execute("DELETE FROM complaints WHERE id = ?", (test_complaint_id,))
+                    print("✅ Test complaint cleaned up")
+                else:
+                    print("❌ Failed to create test complaint")
             else:
-                print("❌ Failed to create test complaint")
-        else:
-            print("ℹ️ No users found for complaint test")
+                print("ℹ️ No users found for complaint test")
         
-        conn.close()
         print("✅ Database test completed successfully")
         return True
         
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate complaint detection for CitiZen AI
+Each complaint's description and address get a MinHash signature; LSH bands
+of the signature are stored in SQLite so a new complaint is only compared
+with open complaints sharing at least one band bucket, not the whole table.
+
+Rebuild the index from the database (offline) with:
+    python -m utils.near_duplicates --rebuild
+"""
+
+import os
+import re
+import sys
+import zlib
+import struct
+import random
+import hashlib
+import argparse
+
+# Signature length and banding; changing either requires a rebuild.
+# 16 bands of 4 rows make pairs with Jaccard similarity 0.5 candidates about
+# half the time and pairs above 0.7 almost always.
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+
+# Characters per shingle
+SHINGLE_SIZE = 5
+
+# Estimated Jaccard similarity at which a candidate is linked as a duplicate
+DUPLICATE_THRESHOLD = float(os.environ.get("CITIZEN_AI_DUPLICATE_THRESHOLD", "0.6"))
+
+# Complaints indexed per batch during a rebuild
+REBUILD_BATCH_SIZE = 1000
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_SIGNATURE_FORMAT = f"<{MINHASH_PERMUTATIONS}Q"
+
+# Fixed seed so signatures stay comparable across processes and restarts
+_permutation_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_permutation_rng.randrange(1, _MERSENNE_PRIME), _permutation_rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+def normalize_duplicate_text(description, address):
+    """Lowercased description and address with punctuation collapsed
+
+    Digits are kept so the same wording at a different house number is not
+    treated as the same incident.
+    """
+    text = f"{description or ''} {address or ''}".lower()
+    return ' '.join(re.sub(r'[^a-z0-9\s]', ' ', text).split())
+
+def shingle_hashes(text, size=SHINGLE_SIZE):
+    """32-bit hashes of the text's character shingles"""
+    if len(text) <= size:
+        return {zlib.crc32(text.encode())}
+    return {zlib.crc32(text[i:i + size].encode()) for i in range(len(text) - size + 1)}
+
+def minhash_signature(description, address):
+    """MinHash signature of a complaint as a tuple of MINHASH_PERMUTATIONS ints"""
+    hashes = shingle_hashes(normalize_duplicate_text(description, address))
+    return tuple(
+        min((a * value + b) % _MERSENNE_PRIME for value in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+def lsh_buckets(signature):
+    """[(band, bucket), ...] for a signature; bucket is a signed 64-bit hash of the band's rows"""
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        digest = hashlib.blake2b(struct.pack(f"<{LSH_ROWS}Q", *rows), digest_size=8).digest()
+        buckets.append((band, struct.unpack("<q", digest)[0]))
+    return buckets
+
+def estimate_similarity(signature, other):
+    """Estimated Jaccard similarity: the share of matching signature positions"""
+    return sum(1 for x, y in zip(signature, other) if x == y) / MINHASH_PERMUTATIONS
+
+def pack_signature(signature):
+    """Signature as a BLOB for storage"""
+    return struct.pack(_SIGNATURE_FORMAT, *signature)
+
+def unpack_signature(blob):
+    """Signature from its stored BLOB"""
+    return struct.unpack(_SIGNATURE_FORMAT, blob)
+
+def create_duplicate_index_tables(cursor):
+    """Create the signature and LSH bucket tables"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS complaint_minhash (
+            complaint_id INTEGER PRIMARY KEY,
+            signature BLOB NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS complaint_lsh_buckets (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            complaint_id INTEGER NOT NULL,
+            PRIMARY KEY (band, bucket, complaint_id)
+        ) WITHOUT ROWID
+    ''')
+
+def find_duplicate(cursor, signature, category, exclude_id=None, threshold=DUPLICATE_THRESHOLD):
+    """Find the open complaint a new complaint most likely duplicates
+
+    Only open complaints of the same category sharing an LSH bucket are
+    compared; the buckets are probed through the bucket table's primary key.
+    Returns (complaint_id, similarity) of the best match at or above the
+    threshold, following the match's own link while that original is still
+    open, or (None, 0.0).
+    """
+    buckets = lsh_buckets(signature)
+    placeholders = ', '.join(['(?, ?)'] * len(buckets))
+    params = [value for bucket in buckets for value in bucket]
+
+    cursor.execute(f'''
+        WITH probe(band, bucket) AS (VALUES {placeholders})
+        SELECT DISTINCT c.id,
+               CASE WHEN original.status != 'Resolved' THEN original.id END,
+               m.signature
+        FROM probe
+        JOIN complaint_lsh_buckets b ON b.band = probe.band AND b.bucket = probe.bucket
+        JOIN complaints c ON c.id = b.complaint_id
+        JOIN complaint_minhash m ON m.complaint_id = c.id
+        LEFT JOIN complaints original ON original.id = c.duplicate_of
+        WHERE c.status != 'Resolved' AND c.category = ? AND c.id != ?
+    ''', params + [category, exclude_id if exclude_id is not None else -1])
+
+    # Highest similarity wins; ties go to the oldest complaint
+    best_rank, best_id = None, None
+    for candidate_id, open_original_id, blob in cursor.fetchall():
+        similarity = estimate_similarity(signature, unpack_signature(blob))
+        if similarity < threshold:
+            continue
+        rank = (similarity, -candidate_id)
+        if best_rank is None or rank > best_rank:
+            best_rank, best_id = rank, open_original_id or candidate_id
+
+    return best_id, (best_rank[0] if best_rank else 0.0)
+
+def index_complaint(cursor, complaint_id, signature):
+    """Store a complaint's signature and LSH buckets"""
+    cursor.execute(
+        'INSERT OR REPLACE INTO complaint_minhash (complaint_id, signature) VALUES (?, ?)',
+        (complaint_id, pack_signature(signature))
+    )
+    cursor.executemany(
+        'INSERT OR IGNORE INTO complaint_lsh_buckets (band, bucket, complaint_id) VALUES (?, ?, ?)',
+        [(band, bucket, complaint_id) for band, bucket in lsh_buckets(signature)]
+    )
+
+def rebuild_duplicate_index(cursor, batch_size=REBUILD_BATCH_SIZE):
+    """Recompute every signature, bucket and duplicate link from the complaints table
+
+    Complaints are replayed in submission order, so each one is matched
+    against the earlier complaints that are open now. Returns
+    (complaints indexed, duplicates linked).
+    """
+    create_duplicate_index_tables(cursor)
+    cursor.execute('DELETE FROM complaint_lsh_buckets')
+    cursor.execute('DELETE FROM complaint_minhash')
+    cursor.execute('UPDATE complaints SET duplicate_of = NULL WHERE duplicate_of IS NOT NULL')
+
+    indexed = linked = 0
+    last_id = 0
+
+    while True:
+        cursor.execute('''
+            SELECT id, category, description, address FROM complaints
+            WHERE id > ?
+            ORDER BY id
+            LIMIT ?
+        ''', (last_id, batch_size))
+        rows = cursor.fetchall()
+
+        if not rows:
+            break
+
+        for complaint_id, category, description, address in rows:
+            signature = minhash_signature(description, address)
+            duplicate_of, _ = find_duplicate(cursor, signature, category, exclude_id=complaint_id)
+            if duplicate_of is not None:
+                cursor.execute('UPDATE complaints SET duplicate_of = ? WHERE id = ?', (duplicate_of, complaint_id))
+                linked += 1
+            index_complaint(cursor, complaint_id, signature)
+
+        indexed += len(rows)
+        last_id = rows[-1][0]
+
+    return indexed, linked
+
+def main():
+    """Rebuild the near-duplicate index from the command line"""
+    parser = argparse.ArgumentParser(description="CitiZen AI near-duplicate index")
+    parser.add_argument('--rebuild', action='store_true', help="Recompute signatures and duplicate links")
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.print_help()
+        return
+
+    # Add parent directory to path for imports
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.data_utils import init_database, db_connection, ensure_db_directory, DUPLICATE_INDEX_SCHEMA_VERSION
+
+    ensure_db_directory()
+    with db_connection() as conn:
+        schema_version = conn.execute('PRAGMA user_version').fetchone()[0]
+
+    init_database()
+
+    # A database older than the index gets it from its migration, which has
+    # just replayed every complaint; rebuilding again would repeat that work
+    if schema_version < DUPLICATE_INDEX_SCHEMA_VERSION:
+        print("✅ Near-duplicate index built by the schema migration")
+        return
+
+    with db_connection() as conn:
+        indexed, linked = rebuild_duplicate_index(conn.cursor())
+
+    print(f"✅ Near-duplicate index rebuilt: {indexed} complaints indexed, {linked} linked as duplicates")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import re
+
+def is_missing(value):
+    """Check for None/NaN-like values without importing pandas"""
+    if value is None:
+        return True
+    try:
+        return bool(value != value)
+    except TypeError:
+        # pandas.NA refuses boolean comparison
+        return True
+
+def preprocess_text(text):
+    """Clean and preprocess text data"""
+    if is_missing(text):
+        return ""
+    
+    # Convert to lowercase
+    text = str(text).lower()
+    
+    # Remove special characters but keep spaces
+    text = re.sub(r'[^a-zA-Z\s]', ' ', text)
+    
+    # Remove extra whitespaces
+    text = ' '.join(text.split())
+    
+    return text
+
+def create_features(description, category):
+    """Create features from complaint description and category"""
+    # Preprocess description
+    clean_desc = preprocess_text(description)
+    clean_category = preprocess_text(category)
+    
+    # Combine description and category for feature creation
+    combined_text = f"{clean_desc} {clean_category}"
+    
+    return combined_text